@@ -9,5 +9,74 @@ DECISION_THRESHOLD = float(os.getenv("DECISION_THRESHOLD", "0.6"))
 WEIGHT_TINY2 = float(os.getenv("WEIGHT_TINY2", "0.7"))
 WEIGHT_BASE = float(os.getenv("WEIGHT_BASE", "0.3"))
 MAX_LENGTH = int(os.getenv("MAX_LENGTH", "512"))
+# классы модели: индекс:название, "ok" — допустимый контент, остальные — нарушения
+LABEL_MAP = os.getenv("LABEL_MAP", "0:ok,1:violation")
+
+
+def _label_map(value: str) -> dict:
+    return {int(index): name.strip() for index, name in (item.split(":", 1) for item in value.split(","))}
+
+
+def _platform_settings(prefix: str) -> dict:
+    """Настройки платформы: <PREFIX>_DECISION_THRESHOLD и т.д., по умолчанию — общие значения"""
+    return {
+        "tiny2_path": os.getenv(f"{prefix}_TINY2_MODEL_PATH", TINY2_MODEL_PATH),
+        "base_path": os.getenv(f"{prefix}_BASE_MODEL_PATH", BASE_MODEL_PATH),
+        "threshold": float(os.getenv(f"{prefix}_DECISION_THRESHOLD", str(DECISION_THRESHOLD))),
+        "weight_tiny2": float(os.getenv(f"{prefix}_WEIGHT_TINY2", str(WEIGHT_TINY2))),
+        "weight_base": float(os.getenv(f"{prefix}_WEIGHT_BASE", str(WEIGHT_BASE))),
+        "label_map": _label_map(os.getenv(f"{prefix}_LABEL_MAP", LABEL_MAP))
+    }
+
+
+# у каждой платформы свои порог, веса и карта классов; модели с одинаковыми путями
+# загружаются один раз и общие для всех платформ
+PLATFORM_SETTINGS = {
+    "youtube": _platform_settings("YOUTUBE"),
+    "vk": _platform_settings("VK"),
+    "rutube": _platform_settings("RUTUBE")
+}
+
+# ensemble — всегда обе модели; cascade — rubert-base только если оценка tiny2
+# попала в полосу DECISION_THRESHOLD ± CASCADE_BAND
+ENSEMBLE_MODE = os.getenv("ENSEMBLE_MODE", "ensemble")
+CASCADE_BAND = float(os.getenv("CASCADE_BAND", "0.15"))
+
+# ONNX Runtime int8: используется, если есть экспорт (python -m core.onnx_export)
+USE_ONNX = os.getenv("USE_ONNX", "true").lower() == "true"
+
+# пакетный инференс: тексты группируются в корзины близкой длины
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "16"))
+MAX_BATCH_TOKENS = int(os.getenv("MAX_BATCH_TOKENS", "8192"))
+
+# потоки и конкурентность инференса: модели работают в отдельном пуле потоков,
+# одновременные запросы одной платформы сливаются в один батч
+INTRA_OP_THREADS = int(os.getenv("INTRA_OP_THREADS", "4"))  # 0 — по умолчанию torch (все ядра узла)
+INTER_OP_THREADS = int(os.getenv("INTER_OP_THREADS", "1"))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+MAX_IN_FLIGHT = int(os.getenv("MAX_IN_FLIGHT", "64"))  # сверх лимита — 503 с Retry-After
+MICRO_BATCH_WAIT_MS = float(os.getenv("MICRO_BATCH_WAIT_MS", "5"))
+MICRO_BATCH_MAX_TEXTS = int(os.getenv("MICRO_BATCH_MAX_TEXTS", "64"))
+
+# длинные тексты: окна по MAX_LENGTH токенов с перекрытием и свертка оценок окон
+WINDOW_OVERLAP = int(os.getenv("WINDOW_OVERLAP", "64"))
+AGGREGATION = os.getenv("AGGREGATION", "max")  # max, mean, topk_mean
+AGGREGATION_TOP_K = int(os.getenv("AGGREGATION_TOP_K", "3"))
+WORST_SPANS = int(os.getenv("WORST_SPANS", "3"))
+
+# префильтр до моделей: словари <platform>.txt и common.txt в LEXICON_DIR
+# (совпадение — BLOCK без инференса), тексты короче PREFILTER_MIN_CHARS — ALLOW
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+LEXICON_DIR = os.getenv("LEXICON_DIR", "./models/lexicons")
+LEXICON_RELOAD_INTERVAL = float(os.getenv("LEXICON_RELOAD_INTERVAL", "30"))
+PREFILTER_MIN_CHARS = int(os.getenv("PREFILTER_MIN_CHARS", "10"))
+
+# кэш вердиктов: хранит детальные оценки по хэшу нормализованного текста
+VERDICT_CACHE_ENABLED = os.getenv("VERDICT_CACHE_ENABLED", "true").lower() == "true"
+VERDICT_CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", "10000"))
+VERDICT_CACHE_DB = os.getenv("VERDICT_CACHE_DB", "") or None  # путь к SQLite для хранения между перезапусками
+
+# платформы, чьи checker'ы загружаются при старте (остальные — при первом запросе)
+PRELOAD_PLATFORMS = [p for p in os.getenv("PRELOAD_PLATFORMS", "youtube").split(",") if p]
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -1,3 +1,4 @@
-from .youtube_policy_checker import YouTubePolicyChecker
+from .policy_checker import PolicyChecker
+from .model_pool import ModelPool, model_pool
 
-__all__ = ["YouTubePolicyChecker"]
+__all__ = ["PolicyChecker", "ModelPool", "model_pool"]
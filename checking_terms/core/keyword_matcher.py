@@ -0,0 +1,83 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+def normalize_char(ch: str) -> str:
+    """Символ для сравнения: нижний регистр и ё -> е, длина строки не меняется"""
+    lowered = ch.lower()[:1] or ch
+    return "е" if lowered == "ё" else lowered
+
+
+class KeywordMatcher:
+    """
+    Автомат Ахо-Корасик: все термины словаря ищутся за один проход по тексту.
+    Регистр и ё/е не различаются. Термин совпадает только целым словом,
+    термин с "*" на конце — как префикс слова (для словоформ: "казино*").
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        # узел автомата: переходы, суффиксная ссылка, выходы (длина термина, термин, префиксный)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, bool]]] = [[]]
+        self.size = 0
+
+        for term in terms:
+            self._add(term)
+        self._build()
+
+    def _add(self, term: str):
+        prefix = term.endswith("*")
+        pattern = "".join(normalize_char(ch) for ch in term.rstrip("*").strip())
+        if not pattern:
+            return
+
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((len(pattern), term, prefix))
+        self.size += 1
+
+    def _build(self):
+        """Суффиксные ссылки обходом в ширину"""
+        # у детей корня суффиксная ссылка — корень (значение по умолчанию)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[Dict]:
+        """
+        Все вхождения терминов
+        Returns:
+            список {"start", "end", "term"} в символах исходного текста
+        """
+        matches = []
+        node = 0
+        for i, raw in enumerate(text):
+            ch = normalize_char(raw)
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+
+            for length, term, prefix in self._out[node]:
+                start, end = i - length + 1, i + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if not prefix and end < len(text) and text[end].isalnum():
+                    continue
+                matches.append({"start": start, "end": end, "term": term})
+        return matches
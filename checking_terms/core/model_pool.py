@@ -0,0 +1,67 @@
+import logging
+import threading
+from typing import Dict, Tuple
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+import torch
+from core.onnx_backend import OnnxSequenceClassifier, onnx_available
+
+logger = logging.getLogger(__name__)
+
+
+class ModelPool:
+    """
+    Общий пул токенизаторов и моделей на процесс.
+    Checker'ы разных платформ с одинаковыми путями получают одни и те же объекты,
+    поэтому новая платформа не добавляет еще одну копию весов в память.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, bool], object] = {}
+        self._tokenizers: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def get_model(self, model_path: str, use_onnx: bool = True):
+        """
+        Модель из пула, при первом обращении загружается:
+        ONNX Runtime (int8), если есть экспорт и use_onnx, иначе PyTorch fp32
+        """
+        key = (model_path, use_onnx and onnx_available(model_path))
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                if key[1]:
+                    model = OnnxSequenceClassifier(model_path, num_threads=torch.get_num_threads())
+                else:
+                    logger.info(f"Загрузка PyTorch модели: {model_path}")
+                    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+                model.eval()
+                self._models[key] = model
+        return model
+
+    def get_tokenizer(self, model_path: str):
+        """Токенизатор из пула, при первом обращении загружается"""
+        with self._lock:
+            tokenizer = self._tokenizers.get(model_path)
+            if tokenizer is None:
+                tokenizer = AutoTokenizer.from_pretrained(model_path)
+                self._tokenizers[model_path] = tokenizer
+        return tokenizer
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Объем весов и буферов каждой загруженной модели в байтах"""
+        with self._lock:
+            models = dict(self._models)
+
+        usage = {}
+        for (model_path, is_onnx), model in models.items():
+            if is_onnx:
+                usage[f"{model_path} (onnx)"] = model.memory_bytes()
+                continue
+            usage[model_path] = sum(
+                tensor.numel() * tensor.element_size()
+                for tensor in list(model.parameters()) + list(model.buffers())
+            )
+        return usage
+
+
+model_pool = ModelPool()
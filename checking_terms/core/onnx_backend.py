@@ -0,0 +1,68 @@
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+# экспортированная модель лежит рядом с исходной: <model_dir>/onnx/model.int8.onnx
+ONNX_SUBDIR = "onnx"
+ONNX_MODEL_FILE = "model.int8.onnx"
+
+
+def onnx_model_path(model_dir: str) -> Path:
+    """Путь к квантованной ONNX модели для директории модели transformers"""
+    return Path(model_dir) / ONNX_SUBDIR / ONNX_MODEL_FILE
+
+
+def onnx_available(model_dir: str) -> bool:
+    """Есть ли onnxruntime и экспортированная модель"""
+    return ort is not None and onnx_model_path(model_dir).exists()
+
+
+class OnnxSequenceClassifier:
+    """
+    Классификатор на ONNX Runtime (int8) с тем же интерфейсом вызова,
+    что использует checker у AutoModelForSequenceClassification: model(**inputs).logits
+    """
+
+    def __init__(self, model_dir: str, num_threads: int = 0):
+        """
+        Args:
+            model_dir: директория модели transformers с экспортом в onnx/
+            num_threads: количество потоков intra-op (0 — по умолчанию onnxruntime)
+        """
+        if ort is None:
+            raise ImportError("onnxruntime не установлен")
+
+        self.path = onnx_model_path(model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(str(self.path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"ONNX модель загружена: {self.path}")
+
+    def __call__(self, **inputs):
+        feed = {
+            name: tensor.numpy().astype(np.int64)
+            for name, tensor in inputs.items()
+            if name in self.input_names
+        }
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+    def eval(self):
+        return self
+
+    def memory_bytes(self) -> int:
+        """Размер квантованных весов в байтах"""
+        return self.path.stat().st_size
@@ -0,0 +1,124 @@
+"""
+Экспорт моделей checking terms в ONNX с динамической int8 квантизацией
+и проверка совпадения оценок с PyTorch.
+
+Запуск из директории сервиса:
+    python -m core.onnx_export                # экспорт обеих моделей из config + сверка с PyTorch
+    python -m core.onnx_export --verify-only  # сверка уже экспортированных моделей
+
+Если оценки ONNX модели расходятся с PyTorch больше допуска, экспорт удаляется
+и команда завершается с ошибкой: сервис останется на PyTorch.
+"""
+import sys
+import inspect
+import logging
+import argparse
+from typing import List
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from core.onnx_backend import OnnxSequenceClassifier, onnx_model_path
+import config
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+OPSET_VERSION = 14
+
+# тексты для сверки: короткие и длинные, с нарушениями и без
+PARITY_TEXTS = [
+    "Привет! Сегодня расскажу, как приготовить борщ.",
+    "Обзор нового смартфона: камера, батарея и экран.",
+    "Купи подписчиков дешево, переходи по ссылке в профиле!!!",
+    "Я тебя найду и тебе будет очень плохо, запомни это.",
+    "В этом видео разбираем основы программирования на Python. " * 40,
+]
+
+
+def export_model(model_dir: str):
+    """
+    Экспортирует модель в <model_dir>/onnx/model.int8.onnx
+    Args:
+        model_dir: директория модели transformers
+    """
+    output_path = onnx_model_path(model_dir)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_path.parent / "model.fp32.onnx"
+
+    logger.info(f"Экспорт {model_dir} в ONNX...")
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model.eval()
+
+    sample = tokenizer(PARITY_TEXTS[0], return_tensors="pt")
+    # экспортер раскладывает входы в порядке аргументов forward(), а не ключей токенизатора;
+    # имена назначаются по позиции, поэтому берутся в том же порядке
+    input_names = [name for name in inspect.signature(model.forward).parameters if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            ({name: sample[name] for name in input_names},),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET_VERSION
+        )
+
+    logger.info("Динамическая int8 квантизация...")
+    quantize_dynamic(str(fp32_path), str(output_path), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+    logger.info(f"✅ Модель сохранена: {output_path}")
+
+
+def verify_parity(model_dir: str, texts: List[str], max_length: int, tolerance: float) -> bool:
+    """
+    Сравнивает вероятность класса "нарушение" у PyTorch и ONNX моделей
+    Returns:
+        True, если максимальное расхождение не больше tolerance
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    torch_model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    torch_model.eval()
+    onnx_model = OnnxSequenceClassifier(model_dir)
+
+    inputs = tokenizer(texts, return_tensors="pt", truncation=True, padding=True, max_length=max_length)
+    with torch.no_grad():
+        torch_probs = torch.softmax(torch_model(**inputs).logits, dim=-1)[:, 1]
+    onnx_probs = torch.softmax(onnx_model(**inputs).logits, dim=-1)[:, 1]
+
+    diff = (torch_probs - onnx_probs).abs()
+    for text, p_torch, p_onnx in zip(texts, torch_probs.tolist(), onnx_probs.tolist()):
+        logger.info(f"'{text[:40]}...': torch={p_torch:.4f} onnx={p_onnx:.4f}")
+
+    max_diff = diff.max().item()
+    ok = max_diff <= tolerance
+    logger.info(f"{'✅' if ok else '❌'} {model_dir}: максимальное расхождение {max_diff:.4f} (допуск {tolerance})")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Экспорт моделей checking terms в ONNX int8")
+    parser.add_argument("--models", nargs="+", default=[config.TINY2_MODEL_PATH, config.BASE_MODEL_PATH])
+    parser.add_argument("--verify-only", action="store_true", help="только сверка уже экспортированных моделей")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="допустимое расхождение вероятностей")
+    args = parser.parse_args()
+
+    ok = True
+    for model_dir in args.models:
+        if not args.verify_only:
+            export_model(model_dir)
+        if not verify_parity(model_dir, PARITY_TEXTS, config.MAX_LENGTH, args.tolerance):
+            ok = False
+            if not args.verify_only:
+                onnx_model_path(model_dir).unlink(missing_ok=True)
+                logger.error(f"❌ Экспорт {model_dir} удален: оценки расходятся с PyTorch")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+import torch
+from core.onnx_backend import OnnxSequenceClassifier
+from core.model_pool import model_pool
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class PolicyChecker:
+    def __init__(
+            self,
+            tiny2_path: str,
+            base_path: str,
+            threshold: float = 0.6,
+            weight_tiny2: float = 0.7,
+            weight_base: float = 0.3,
+            max_length: int = 512,
+            batch_size: int = 16,
+            max_batch_tokens: int = 8192,
+            window_overlap: int = 64,
+            aggregation: str = "max",
+            top_k: int = 3,
+            worst_spans: int = 3,
+            use_onnx: bool = True,
+            mode: str = "ensemble",
+            cascade_band: float = 0.15,
+            label_map: Optional[Dict[int, str]] = None
+    ):
+        """
+        Агент для классификации текста на соответствие политике платформы.
+        Модели и токенизаторы берутся из общего пула, экземпляры для разных платформ
+        отличаются только порогом, весами и картой классов.
+
+        Args:
+            tiny2_path: путь к модели cointegrated/rubert-tiny2
+            base_path: путь к модели rubert-base-cased
+            threshold: порог уверенности для класса "нарушение"
+            weight_tiny2: вес модели tiny2 в ансамбле
+            weight_base: вес модели base в ансамбле
+            max_length: максимальная длина токенов
+            batch_size: максимальное количество текстов в одном прогоне модели
+            max_batch_tokens: максимальное количество токенов (с паддингом) в одном прогоне
+            window_overlap: перекрытие соседних окон длинного текста в токенах
+            aggregation: правило свертки оценок окон: max, mean или topk_mean
+            top_k: количество окон для topk_mean
+            worst_spans: сколько самых "плохих" окон возвращать в details
+            use_onnx: использовать ONNX Runtime (int8), если модель экспортирована
+            mode: "ensemble" — всегда обе модели, "cascade" — base только при неуверенной tiny2
+            cascade_band: полуширина полосы неуверенности вокруг threshold для каскада
+            label_map: классы модели: индекс -> "ok" или название нарушения;
+                оценка нарушения — сумма вероятностей всех классов, кроме "ok"
+        """
+        self.tiny2_path = tiny2_path
+        self.base_path = base_path
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.window_overlap = window_overlap
+        self.aggregation = aggregation
+        self.top_k = top_k
+        self.worst_spans = worst_spans
+        self.use_onnx = use_onnx
+        self.mode = mode
+        self.cascade_band = cascade_band
+        self.threshold = threshold
+        self.weight_tiny2 = weight_tiny2
+        self.weight_base = weight_base
+        self.label_map = label_map or {0: "ok", 1: "violation"}
+        self.violation_classes = sorted(i for i, name in self.label_map.items() if name != "ok")
+
+        logger.info("Загрузка моделей checking terms...")
+        self.model1 = model_pool.get_model(tiny2_path, use_onnx)
+        self.tokenizer1 = model_pool.get_tokenizer(tiny2_path)
+
+        self.model2 = model_pool.get_model(base_path, use_onnx)
+        self.tokenizer2 = model_pool.get_tokenizer(base_path)
+        logger.info("✅ Модели для checking terms загружены")
+
+    def predict(self, text: str) -> Dict[str, any]:
+        """
+        Проверяет, соответствует ли текст политике платформы.
+
+        Args:
+            text: входной текст (транскрибированный текст из видео и т.д.)
+        Returns:
+            dict: {
+                "label": "Соответствует" или "Не соответствует",
+                "confidence": float,
+                "details": {
+                    "tiny2_score": float,
+                    "base_score": float или None (каскад завершился на tiny2),
+                    "final_score": float,
+                    "path": "ensemble" или "tiny2",
+                    "windows": int,
+                    "worst_spans": [{"start", "end", "score", "excerpt"}]
+                }
+            }
+        """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, any]]:
+        """
+        Пакетная проверка списка текстов.
+        Каждая модель прогоняется один раз на каждую корзину текстов близкой длины.
+
+        Args:
+            texts: список текстов
+        Returns:
+            список результатов в формате predict, в порядке входных текстов
+        """
+        if not texts:
+            return []
+
+        try:
+            # длинные тексты режутся на перекрывающиеся окна, все окна всех текстов
+            # классифицируются вместе батчами
+            spans = [self._split_windows(text) for text in texts]
+            bounds = []
+            windows = []
+            for text, text_spans in zip(texts, spans):
+                bounds.append((len(windows), len(windows) + len(text_spans)))
+                windows.extend(text[start:end] for start, end in text_spans)
+
+            with torch.no_grad():
+                probs1 = self._score(self.model1, self.tokenizer1, windows)
+
+                # в каскадном режиме base запускается только для текстов,
+                # чья оценка tiny2 попала в полосу неуверенности вокруг порога
+                need_base = [
+                    self.mode != "cascade"
+                    or abs(self._aggregate(probs1[lo:hi]) - self.threshold) <= self.cascade_band
+                    for lo, hi in bounds
+                ]
+                base_windows = [i for (lo, hi), need in zip(bounds, need_base) if need for i in range(lo, hi)]
+                probs2 = [None] * len(windows)
+                for i, prob in zip(base_windows, self._score(self.model2, self.tokenizer2, [windows[i] for i in base_windows])):
+                    probs2[i] = prob
+
+            results = []
+            for text, text_spans, (lo, hi), use_base in zip(texts, spans, bounds, need_base):
+                window_probs1 = probs1[lo:hi]
+                prob1 = self._aggregate(window_probs1)
+
+                if use_base:
+                    # —— Ансамбль моделей ——
+                    window_probs2 = probs2[lo:hi]
+                    window_scores = [
+                        self.weight_tiny2 * p1 + self.weight_base * p2
+                        for p1, p2 in zip(window_probs1, window_probs2)
+                    ]
+                    prob2 = self._aggregate(window_probs2)
+                    path = "ensemble"
+                else:
+                    # —— Ранний выход: tiny2 уверена ——
+                    window_scores = window_probs1
+                    prob2 = None
+                    path = "tiny2"
+
+                final_score = self._aggregate(window_scores)
+
+                result = self.judge({
+                    "tiny2_score": round(prob1, 4),
+                    "base_score": round(prob2, 4) if prob2 is not None else None,
+                    "final_score": round(final_score, 4),
+                    "path": path,
+                    "windows": len(text_spans),
+                    "worst_spans": self._worst_spans(text, text_spans, window_scores)
+                })
+                results.append(result)
+                logger.info(
+                    f"Текст '{text[:50]}...': {result['label']} "
+                    f"(уверенность: {result['confidence']:.2f}, окон: {len(text_spans)}, путь: {path})"
+                )
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Ошибка при обработке текстов: {e}")
+            return [
+                {
+                    "label": "Ошибка",
+                    "confidence": 0.0,
+                    "details": {"error": str(e)}
+                }
+                for _ in texts
+            ]
+
+    def judge(self, details: Dict) -> Dict[str, any]:
+        """
+        Выносит вердикт по детальным оценкам с текущим порогом.
+        Позволяет пересудить сохраненные оценки без повторного инференса.
+        """
+        final_score = details["final_score"]
+        if final_score > self.threshold:
+            label = "Не соответствует"
+            confidence = final_score
+        else:
+            label = "Соответствует"
+            confidence = 1 - final_score
+
+        return {
+            "label": label,
+            "confidence": round(confidence, 4),
+            "details": details
+        }
+
+    def is_reusable(self, details: Dict) -> bool:
+        """
+        Можно ли пересудить сохраненные оценки при текущих настройках.
+        Оценка только по tiny2 непригодна, если теперь нужен ансамбль
+        (режим ensemble или оценка попала в полосу неуверенности каскада).
+        """
+        if details.get("path") != "tiny2":
+            return True
+        if self.mode != "cascade":
+            return False
+        return abs(details["tiny2_score"] - self.threshold) > self.cascade_band
+
+    def model_fingerprint(self) -> str:
+        """
+        Конфигурация, от которой зависят оценки (но не вердикт):
+        модели, бэкенд, веса ансамбля, классы нарушений, окна и свертка. Порог сюда не входит.
+        """
+        backend = "onnx" if isinstance(self.model1, OnnxSequenceClassifier) else "torch"
+        return (
+            f"{self.tiny2_path}|{self.base_path}|{backend}|{self.weight_tiny2}|{self.weight_base}|"
+            f"{self.violation_classes}|{self.max_length}|{self.window_overlap}|{self.aggregation}|{self.top_k}"
+        )
+
+    def _split_windows(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Делит текст на перекрывающиеся окна по токенам tiny2.
+        Окна задаются символьными смещениями, чтобы обе модели видели один и тот же фрагмент
+        (у base свой словарь, лишние токены на краю окна отсекаются, их покрывает перекрытие).
+
+        Returns:
+            список (start, end) в символах
+        """
+        window_tokens = self.max_length - 2  # [CLS] и [SEP]
+        offsets = self.tokenizer1(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True
+        )["offset_mapping"]
+
+        if len(offsets) <= window_tokens:
+            return [(0, len(text))]
+
+        stride = max(1, window_tokens - self.window_overlap)
+        spans = []
+        for start in range(0, len(offsets), stride):
+            end = min(start + window_tokens, len(offsets))
+            spans.append((offsets[start][0], offsets[end - 1][1]))
+            if end == len(offsets):
+                break
+        return spans
+
+    def _aggregate(self, scores: List[float]) -> float:
+        """Сводит оценки окон в оценку текста по правилу aggregation: max, mean или topk_mean"""
+        if self.aggregation == "mean":
+            return sum(scores) / len(scores)
+        if self.aggregation == "topk_mean":
+            top = sorted(scores, reverse=True)[:self.top_k]
+            return sum(top) / len(top)
+        return max(scores)
+
+    def _worst_spans(self, text: str, spans: List[Tuple[int, int]], scores: List[float]) -> List[Dict]:
+        """Окна с наибольшей оценкой нарушения и их смещения в символах"""
+        worst = sorted(range(len(spans)), key=lambda i: scores[i], reverse=True)[:self.worst_spans]
+        return [
+            {
+                "start": spans[i][0],
+                "end": spans[i][1],
+                "score": round(scores[i], 4),
+                "excerpt": text[spans[i][0]:spans[i][1]][:200]
+            }
+            for i in worst
+        ]
+
+    def _score(self, model, tokenizer, texts: List[str]) -> List[float]:
+        """
+        Вероятность нарушения (сумма по классам нарушений) для каждого текста.
+        Тексты токенизируются один раз, сортируются по длине и группируются в корзины,
+        каждая корзина дополняется паддингом только до своего самого длинного текста.
+        """
+        if not texts:
+            return []
+
+        encodings = tokenizer(texts, truncation=True, max_length=self.max_length)
+        features = [
+            {key: encodings[key][i] for key in encodings.keys()}
+            for i in range(len(texts))
+        ]
+
+        scores = [0.0] * len(texts)
+        for bucket in self._length_buckets([len(f["input_ids"]) for f in features]):
+            inputs = tokenizer.pad([features[i] for i in bucket], padding=True, return_tensors="pt")
+            logits = model(**inputs).logits
+            probs = torch.softmax(logits, dim=-1)[:, self.violation_classes].sum(dim=-1).tolist()
+            for i, prob in zip(bucket, probs):
+                scores[i] = prob
+        return scores
+
+    def _length_buckets(self, lengths: List[int]) -> List[List[int]]:
+        """
+        Разбивает индексы на корзины по возрастанию длины.
+        Корзина ограничена batch_size текстами и max_batch_tokens токенами с учетом паддинга.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        buckets, current = [], []
+        for i in order:
+            # индексы отсортированы, поэтому текущий текст — самый длинный в корзине
+            if current and (
+                len(current) >= self.batch_size
+                or (len(current) + 1) * lengths[i] > self.max_batch_tokens
+            ):
+                buckets.append(current)
+                current = []
+            current.append(i)
+        if current:
+            buckets.append(current)
+        return buckets
@@ -1,6 +1,8 @@
 import logging
 from fastapi import FastAPI
 from routes import policy_router
+from services import preload_checkers
+from services.inference_executor import configure_threads
 import uvicorn
 import config
 
@@ -21,6 +23,13 @@ app.include_router(policy_router, tags=["policy"])
 logger.info("Content Policy Checker запущен")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Загрузка моделей один раз при старте, а не на каждый запрос"""
+    configure_threads(config.INTRA_OP_THREADS, config.INTER_OP_THREADS)
+    preload_checkers(config.PRELOAD_PLATFORMS)
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "checking_terms"}
@@ -1,3 +1,21 @@
-from .schemas import CheckRequest, CheckResponse
+from .schemas import (
+    CheckRequest,
+    CheckResponse,
+    BatchCheckRequest,
+    BatchCheckResponse,
+    CheckItem,
+    MultiCheckRequest,
+    MultiCheckResult,
+    MultiCheckResponse
+)
 
-__all__ = ["CheckRequest", "CheckResponse"]
+__all__ = [
+    "CheckRequest",
+    "CheckResponse",
+    "BatchCheckRequest",
+    "BatchCheckResponse",
+    "CheckItem",
+    "MultiCheckRequest",
+    "MultiCheckResult",
+    "MultiCheckResponse"
+]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 
 class CheckRequest(BaseModel):
@@ -19,3 +19,49 @@ class CheckResponse(BaseModel):
     verdict: str  # ALLOW или BLOCK
     confidence: float
     details: dict
+
+
+class BatchCheckRequest(BaseModel):
+    """
+    Запрос на пакетную проверку нескольких текстов для одной платформы
+    """
+    texts: List[str]
+    platform: Literal["youtube", "rutube", "vk"] = "youtube"
+
+
+class BatchCheckResponse(BaseModel):
+    """
+    Результаты пакетной проверки в порядке входных текстов
+    """
+    platform: str
+    results: List[CheckResponse]
+
+
+class CheckItem(BaseModel):
+    """
+    Один текст в комбинированном запросе
+    """
+    id: str
+    text: str
+    platform: Literal["youtube", "rutube", "vk"] = "youtube"
+
+
+class MultiCheckRequest(BaseModel):
+    """
+    Комбинированный запрос: все тексты задания (транскрипт, заголовки, описания) сразу
+    """
+    items: List[CheckItem]
+
+
+class MultiCheckResult(CheckResponse):
+    """
+    Результат проверки одного текста комбинированного запроса
+    """
+    id: str
+
+
+class MultiCheckResponse(BaseModel):
+    """
+    Результаты комбинированной проверки в порядке входных текстов
+    """
+    results: List[MultiCheckResult]
@@ -1,9 +1,21 @@
+import asyncio
 import logging
 from pathlib import Path
 from fastapi import APIRouter, HTTPException
 
-from models import CheckRequest, CheckResponse
-from services import get_checker, get_supported_platforms
+from models import (
+    CheckRequest,
+    CheckResponse,
+    BatchCheckRequest,
+    BatchCheckResponse,
+    MultiCheckRequest,
+    MultiCheckResult,
+    MultiCheckResponse
+)
+from services import get_supported_platforms, get_memory_usage
+from services.inference_executor import inference_executor, InferenceBusyError
+from services.verdict_cache import verdict_cache
+from services.prefilter import prefilter
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +48,7 @@ async def check_policy(request: CheckRequest):
         else:
             raise HTTPException(status_code=400, detail="Необходимо указать text или file_path")
         
-        checker = get_checker(request.platform)
-        
-        result = checker.check(text)
+        result = (await inference_executor.check(request.platform, [text]))[0]
         logger.info(f"Проверка завершена: {result['verdict']} (уверенность: {result['confidence']:.2f})")
         
         return CheckResponse(
@@ -48,6 +58,13 @@ async def check_policy(request: CheckRequest):
             details=result["details"]
         )
         
+    except InferenceBusyError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(inference_executor.retry_after())}
+        )
     except ValueError as e:
         logger.error(f"Неподдерживаемая платформа: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -56,7 +73,112 @@ async def check_policy(request: CheckRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/check_policy/batch", response_model=BatchCheckResponse)
+async def check_policy_batch(request: BatchCheckRequest):
+    """
+    Пакетная проверка нескольких текстов для одной платформы
+    
+    Args:
+        request: texts (список текстов) и platform
+    Returns:
+        Результаты проверки в порядке входных текстов
+    """
+    logger.info(f"Получен пакетный запрос на проверку {len(request.texts)} текстов для платформы: {request.platform}")
+    
+    try:
+        results = await inference_executor.check(request.platform, request.texts)
+        
+        return BatchCheckResponse(
+            platform=request.platform,
+            results=[
+                CheckResponse(
+                    platform=request.platform,
+                    verdict=result["verdict"],
+                    confidence=result["confidence"],
+                    details=result["details"]
+                )
+                for result in results
+            ]
+        )
+        
+    except InferenceBusyError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(inference_executor.retry_after())}
+        )
+    except ValueError as e:
+        logger.error(f"Неподдерживаемая платформа: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Ошибка при пакетной проверке контента: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/check_policy/multi", response_model=MultiCheckResponse)
+async def check_policy_multi(request: MultiCheckRequest):
+    """
+    Комбинированная проверка текстов разных платформ одним запросом.
+    Тексты группируются по платформам, каждая группа проверяется одним батчем.
+    
+    Args:
+        request: items — список {id, text, platform}
+    Returns:
+        Результаты проверки с id в порядке входных текстов
+    """
+    logger.info(f"Получен комбинированный запрос на проверку {len(request.items)} текстов")
+    
+    try:
+        groups = {}
+        for i, item in enumerate(request.items):
+            groups.setdefault(item.platform, []).append(i)
+        
+        checked = await asyncio.gather(*(
+            inference_executor.check(platform, [request.items[i].text for i in indices])
+            for platform, indices in groups.items()
+        ))
+        
+        results = [None] * len(request.items)
+        for (platform, indices), platform_results in zip(groups.items(), checked):
+            for i, result in zip(indices, platform_results):
+                results[i] = MultiCheckResult(
+                    id=request.items[i].id,
+                    platform=platform,
+                    verdict=result["verdict"],
+                    confidence=result["confidence"],
+                    details=result["details"]
+                )
+        
+        return MultiCheckResponse(results=results)
+        
+    except InferenceBusyError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(inference_executor.retry_after())}
+        )
+    except ValueError as e:
+        logger.error(f"Неподдерживаемая платформа: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Ошибка при комбинированной проверке контента: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/platforms")
 async def get_platforms():
     """Возвращает список поддерживаемых платформ"""
     return {"platforms": get_supported_platforms()}
+
+
+@router.get("/stats")
+async def get_stats():
+    """Память, занятая загруженными моделями, метрики префильтра, кэша вердиктов и исполнителя инференса"""
+    return {
+        "memory": get_memory_usage(),
+        "inference": inference_executor.stats(),
+        "prefilter": prefilter.stats() if prefilter else None,
+        "verdict_cache": verdict_cache.stats() if verdict_cache else None
+    }
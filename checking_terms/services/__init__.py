@@ -1,4 +1,4 @@
 from .base_checker import BasePolicyChecker
-from .checker_registry import get_checker, get_supported_platforms
+from .checker_registry import get_checker, get_supported_platforms, preload_checkers, get_memory_usage
 
-__all__ = ["BasePolicyChecker", "get_checker", "get_supported_platforms"]
+__all__ = ["BasePolicyChecker", "get_checker", "get_supported_platforms", "preload_checkers", "get_memory_usage"]
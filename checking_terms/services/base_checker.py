@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List
 
 
 class BasePolicyChecker(ABC):
@@ -24,6 +24,18 @@ class BasePolicyChecker(ABC):
         """
         pass
     
+    def check_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Пакетная проверка текстов. По умолчанию проверяет тексты по одному,
+        checker'ы с нейросетевыми моделями переопределяют ее батчевым инференсом.
+        
+        Args:
+            texts: Тексты для проверки
+        Returns:
+            список dict в формате check, в порядке входных текстов
+        """
+        return [self.check(text) for text in texts]
+    
     @abstractmethod
     def get_platform_name(self) -> str:
         """Возвращает имя платформы (youtube, rutube, vk)"""
@@ -1,18 +1,29 @@
-from typing import Dict, Type
+import os
+import logging
+import threading
+from typing import Dict, List, Optional, Type
 from services.base_checker import BasePolicyChecker
-from services.platforms import YouTubePolicyService
+from services.platforms import YouTubePolicyService, VKPolicyService, RutubePolicyService
+from core.model_pool import model_pool
+
+logger = logging.getLogger(__name__)
 
 
 CHECKERS: Dict[str, Type[BasePolicyChecker]] = {
     "youtube": YouTubePolicyService,
-    # "rutube": RutubePolicyService,
-    # "vk": VKPolicyService
+    "rutube": RutubePolicyService,
+    "vk": VKPolicyService
 }
 
+# экземпляры checker'ов на процесс: модели грузятся один раз, а не на каждый запрос
+_instances: Dict[str, BasePolicyChecker] = {}
+_lock = threading.Lock()
+
 
 def get_checker(platform: str) -> BasePolicyChecker:
     """
-    Получить checker для заданной платформы
+    Получить checker для заданной платформы.
+    Экземпляр создается при первом обращении и переиспользуется всеми запросами.
     
     Args:
         platform: имя платформы (youtube, rutube, vk)
@@ -25,9 +36,49 @@ def get_checker(platform: str) -> BasePolicyChecker:
         supported = ", ".join(CHECKERS.keys())
         raise ValueError(f"Платформа '{platform}' не поддерживается. Доступные: {supported}")
     
-    return CHECKERS[platform]()
+    checker = _instances.get(platform)
+    if checker is None:
+        with _lock:
+            checker = _instances.get(platform)
+            if checker is None:
+                logger.info(f"Создание checker для платформы {platform}")
+                checker = CHECKERS[platform]()
+                _instances[platform] = checker
+    return checker
+
+
+def preload_checkers(platforms: List[str]):
+    """
+    Загрузить checker'ы заранее (при старте сервиса)
+    
+    Args:
+        platforms: список платформ
+    """
+    for platform in platforms:
+        get_checker(platform)
+    logger.info(f"Предзагружены checker'ы: {', '.join(platforms)}")
 
 
 def get_supported_platforms() -> list:
     """Возвращает список поддерживаемых платформ"""
     return list(CHECKERS.keys())
+
+
+def get_memory_usage() -> Dict:
+    """
+    Память, занятая моделями общего пула, и RSS процесса в байтах.
+    Считается по моделям, а не по checker'ам: платформы делят одни и те же веса.
+    """
+    return {
+        "models": model_pool.memory_usage(),
+        "checkers": list(_instances.keys()),
+        "process_rss": _process_rss()
+    }
+
+
+def _process_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
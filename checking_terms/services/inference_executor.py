@@ -0,0 +1,161 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple
+import torch
+from services.checker_registry import get_checker
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBusyError(Exception):
+    """Превышен лимит одновременных запросов на инференс"""
+    pass
+
+
+def configure_threads(intra_op: int, inter_op: int):
+    """
+    Задает количество потоков torch (и ONNX Runtime, он берет intra-op из torch).
+    Вызывается до загрузки моделей: inter-op можно задать только до первой параллельной работы.
+
+    Args:
+        intra_op: потоки внутри одной операции (0 — по умолчанию torch)
+        inter_op: потоки между операциями (0 — по умолчанию torch)
+    """
+    if intra_op > 0:
+        torch.set_num_threads(intra_op)
+    if inter_op > 0:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            logger.warning(f"Не удалось задать inter-op потоки: {e}")
+    logger.info(f"Потоки torch: intra-op {torch.get_num_threads()}, inter-op {torch.get_num_interop_threads()}")
+
+
+class InferenceExecutor:
+    """
+    Выполняет проверки вне event loop на ограниченном пуле потоков.
+    Одновременные запросы к одной платформе, пришедшие в пределах окна ожидания,
+    сливаются в один вызов check_batch (один прогон моделей).
+    Запросы сверх лимита отклоняются, а не копятся в очереди.
+    """
+
+    def __init__(self, workers: int = 1, max_in_flight: int = 64, batch_wait_ms: float = 5.0, max_batch_texts: int = 64):
+        """
+        Args:
+            workers: количество потоков инференса
+            max_in_flight: максимальное количество запросов в ожидании и в работе
+            batch_wait_ms: сколько ждать попутные запросы перед запуском батча
+            max_batch_texts: при таком количестве накопленных текстов батч запускается сразу
+        """
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.batch_wait = batch_wait_ms / 1000
+        self.max_batch_texts = max_batch_texts
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="policy-inference")
+        # все поля ниже меняются только из event loop, блокировки не нужны
+        self._pending: Dict[str, List[Tuple[List[str], asyncio.Future]]] = {}
+        self._pending_texts: Dict[str, int] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        # event loop хранит задачи по слабой ссылке: без этого набора батч может быть собран GC
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._batches = 0
+        self._merged_requests = 0
+        self._avg_duration = 0.1  # сек, скользящее среднее длительности батча
+
+    async def check(self, platform: str, texts: List[str]) -> List[Dict]:
+        """
+        Проверка текстов через общий батч платформы
+        Returns:
+            результаты check_batch в порядке входных текстов
+        Raises:
+            InferenceBusyError: если уже max_in_flight запросов
+        """
+        if not texts:
+            return []
+        if self._in_flight >= self.max_in_flight:
+            raise InferenceBusyError(f"Слишком много запросов на проверку ({self.max_in_flight})")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight += 1
+        try:
+            self._pending.setdefault(platform, []).append((texts, future))
+            self._pending_texts[platform] = self._pending_texts.get(platform, 0) + len(texts)
+
+            if self._pending_texts[platform] >= self.max_batch_texts:
+                self._flush(platform)
+            elif platform not in self._flush_handles:
+                self._flush_handles[platform] = loop.call_later(self.batch_wait, self._flush, platform)
+
+            return await future
+        finally:
+            self._in_flight -= 1
+
+    def retry_after(self) -> int:
+        """Оценка в секундах, через сколько освободится место"""
+        return max(1, int(self._avg_duration * self.max_in_flight / max(1, self.max_batch_texts)))
+
+    def stats(self) -> Dict:
+        """Состояние исполнителя для мониторинга"""
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "batches": self._batches,
+            "merged_requests": self._merged_requests,
+            "avg_batch_duration": round(self._avg_duration, 4),
+            "intra_op_threads": torch.get_num_threads()
+        }
+
+    def _flush(self, platform: str):
+        handle = self._flush_handles.pop(platform, None)
+        if handle is not None:
+            handle.cancel()
+        requests = self._pending.pop(platform, [])
+        self._pending_texts.pop(platform, None)
+        if requests:
+            task = asyncio.ensure_future(self._run(platform, requests))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, platform: str, requests: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for request_texts, _ in requests for text in request_texts]
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        try:
+            results = await loop.run_in_executor(self._pool, self._check_batch, platform, texts)
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        duration = time.monotonic() - started
+        self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+        self._batches += 1
+        if len(requests) > 1:
+            self._merged_requests += len(requests)
+            logger.debug(f"Объединено {len(requests)} запросов ({len(texts)} текстов) за {duration:.3f} сек")
+
+        offset = 0
+        for request_texts, future in requests:
+            # запрос мог быть отменен (клиент отключился) — результат просто отбрасывается
+            if not future.done():
+                future.set_result(results[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+    @staticmethod
+    def _check_batch(platform: str, texts: List[str]) -> List[Dict]:
+        return get_checker(platform).check_batch(texts)
+
+
+inference_executor = InferenceExecutor(
+    workers=config.INFERENCE_WORKERS,
+    max_in_flight=config.MAX_IN_FLIGHT,
+    batch_wait_ms=config.MICRO_BATCH_WAIT_MS,
+    max_batch_texts=config.MICRO_BATCH_MAX_TEXTS
+)
@@ -1,3 +1,6 @@
+from .policy_service import PolicyModelService
 from .youtube import YouTubePolicyService
+from .vk import VKPolicyService
+from .rutube import RutubePolicyService
 
-__all__ = ["YouTubePolicyService"]
+__all__ = ["PolicyModelService", "YouTubePolicyService", "VKPolicyService", "RutubePolicyService"]
@@ -0,0 +1,119 @@
+import logging
+from typing import Dict, List
+from services.base_checker import BasePolicyChecker
+from services.verdict_cache import verdict_cache, make_key
+from services.prefilter import prefilter
+from core.policy_checker import PolicyChecker
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class PolicyModelService(BasePolicyChecker):
+    """
+    Checker платформы на ансамбле RuBERT из общего пула моделей.
+    Подклассы задают только PLATFORM, настройки берутся из config.PLATFORM_SETTINGS.
+    """
+    
+    PLATFORM = ""
+    
+    def __init__(self):
+        """Инициализация с параметрами платформы из config"""
+        logger.info(f"Инициализация {self.PLATFORM} Policy Service...")
+        self.checker = PolicyChecker(
+            **config.PLATFORM_SETTINGS[self.PLATFORM],
+            max_length=config.MAX_LENGTH,
+            batch_size=config.BATCH_SIZE,
+            max_batch_tokens=config.MAX_BATCH_TOKENS,
+            window_overlap=config.WINDOW_OVERLAP,
+            aggregation=config.AGGREGATION,
+            top_k=config.AGGREGATION_TOP_K,
+            worst_spans=config.WORST_SPANS,
+            use_onnx=config.USE_ONNX,
+            mode=config.ENSEMBLE_MODE,
+            cascade_band=config.CASCADE_BAND
+        )
+        logger.info(f"{self.PLATFORM} Policy Service готов")
+    
+    def check(self, text: str) -> Dict:
+        """
+        Проверка текста на соответствие политике платформы
+        
+        Args:
+            text: Текст для проверки
+        Returns:
+            dict с verdict, confidence, details
+        """
+        return self.check_batch([text])[0]
+    
+    def check_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        Пакетная проверка текстов за один проход каждой модели на корзину.
+        Сначала префильтр (словарь платформы, короткие тексты), затем кэш:
+        тексты, уже проверенные с той же конфигурацией моделей, пересуживаются
+        с текущим порогом. Модели запускаются только для оставшихся.
+        
+        Args:
+            texts: Тексты для проверки
+        Returns:
+            список dict с verdict, confidence, details
+        """
+        if not prefilter:
+            return self._check_models(texts)
+        
+        results: List[Dict] = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            results[i] = prefilter.check(text, self.PLATFORM)
+            if results[i] is None:
+                pending.append(i)
+        
+        if pending:
+            for i, result in zip(pending, self._check_models([texts[i] for i in pending])):
+                results[i] = result
+        
+        if len(pending) < len(texts):
+            logger.info(f"Решено префильтром: {len(texts) - len(pending)} из {len(texts)} текстов")
+        return results
+    
+    def _check_models(self, texts: List[str]) -> List[Dict]:
+        """Проверка моделями с кэшем вердиктов"""
+        if not verdict_cache:
+            return [self._to_verdict(result) for result in self.checker.predict_batch(texts)]
+        
+        fingerprint = self.checker.model_fingerprint()
+        keys = [make_key(text, self.get_platform_name(), fingerprint) for text in texts]
+        results: List[Dict] = [None] * len(texts)
+        misses = []
+        
+        for i, key in enumerate(keys):
+            details = verdict_cache.get(key)
+            if details is not None and self.checker.is_reusable(details):
+                verdict_cache.record(hit=True)
+                results[i] = self._to_verdict(self.checker.judge(dict(details, cached=True)))
+            else:
+                verdict_cache.record(hit=False)
+                misses.append(i)
+        
+        if misses:
+            predicted = self.checker.predict_batch([texts[i] for i in misses])
+            for i, result in zip(misses, predicted):
+                if "error" not in result["details"]:
+                    verdict_cache.put(keys[i], result["details"])
+                results[i] = self._to_verdict(result)
+        
+        logger.info(f"Проверено {len(texts)} текстов, из кэша: {len(texts) - len(misses)}")
+        return results
+    
+    @staticmethod
+    def _to_verdict(result: Dict) -> Dict:
+        verdict = "BLOCK" if result["label"] == "Не соответствует" else "ALLOW"
+        
+        return {
+            "verdict": verdict,
+            "confidence": result["confidence"],
+            "details": result["details"]
+        }
+    
+    def get_platform_name(self) -> str:
+        return self.PLATFORM
@@ -0,0 +1,10 @@
+from services.platforms.policy_service import PolicyModelService
+
+
+class RutubePolicyService(PolicyModelService):
+    """
+    Проверка на соответствие политике Rutube
+    (порог, веса и карта классов — RUTUBE_* в config)
+    """
+    
+    PLATFORM = "rutube"
@@ -0,0 +1,10 @@
+from services.platforms.policy_service import PolicyModelService
+
+
+class VKPolicyService(PolicyModelService):
+    """
+    Проверка на соответствие политике VK
+    (порог, веса и карта классов — VK_* в config)
+    """
+    
+    PLATFORM = "vk"
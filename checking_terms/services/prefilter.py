@@ -0,0 +1,162 @@
+import re
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from core.keyword_matcher import KeywordMatcher
+import config
+
+logger = logging.getLogger(__name__)
+
+# файл общего словаря, действует для всех платформ
+COMMON_LEXICON = "common"
+
+
+class Lexicon:
+    """
+    Словарь запрещенных терминов и шаблонов из текстовых файлов:
+    одна строка — один термин ("казино*" — префикс слова),
+    "re:<выражение>" — регулярное выражение, "#" — комментарий
+    """
+
+    def __init__(self, paths: List[Path]):
+        terms = []
+        self.patterns: List[re.Pattern] = []
+        for path in paths:
+            for line_no, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("re:"):
+                    try:
+                        self.patterns.append(re.compile(line[3:], re.IGNORECASE))
+                    except re.error as e:
+                        logger.warning(f"{path}:{line_no}: некорректное выражение пропущено: {e}")
+                else:
+                    terms.append(line)
+        self.matcher = KeywordMatcher(terms)
+
+    def find(self, text: str) -> List[Dict]:
+        """Вхождения терминов и шаблонов, отсортированные по позиции"""
+        matches = self.matcher.find(text)
+        for pattern in self.patterns:
+            for match in pattern.finditer(text):
+                if match.end() > match.start():
+                    matches.append({"start": match.start(), "end": match.end(), "term": f"re:{pattern.pattern}"})
+        return sorted(matches, key=lambda m: m["start"])
+
+    def __len__(self) -> int:
+        return self.matcher.size + len(self.patterns)
+
+
+class Prefilter:
+    """
+    Дешевая проверка до нейросетевых моделей:
+    совпадение со словарем платформы — сразу BLOCK с найденными фрагментами,
+    очень короткий текст (или текст без букв) — сразу ALLOW.
+    Словари <platform>.txt и common.txt перечитываются при изменении файлов.
+    """
+
+    def __init__(self, lexicon_dir: str, min_chars: int = 10, reload_interval: float = 30.0):
+        """
+        Args:
+            lexicon_dir: директория со словарями
+            min_chars: тексты короче (без пробелов по краям) считаются безопасными
+            reload_interval: как часто (сек) проверять изменение файлов словарей
+        """
+        self.lexicon_dir = Path(lexicon_dir)
+        self.min_chars = min_chars
+        self.reload_interval = reload_interval
+        self._lexicons: Dict[str, Tuple[tuple, Lexicon]] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._counts = {"block": 0, "allow": 0, "pass": 0}
+
+    def check(self, text: str, platform: str) -> Optional[Dict]:
+        """
+        Returns:
+            dict с verdict, confidence, details, если решение принято без моделей, иначе None
+        """
+        lexicon = self._lexicon(platform)
+        matches = lexicon.find(text) if lexicon else []
+
+        if matches:
+            result = {
+                "verdict": "BLOCK",
+                "confidence": 1.0,
+                "details": {
+                    "prefilter": "lexicon",
+                    "matches": [
+                        dict(match, excerpt=text[match["start"]:match["end"]])
+                        for match in matches[:config.WORST_SPANS]
+                    ],
+                    "total_matches": len(matches)
+                }
+            }
+            self._count("block")
+        elif len(text.strip()) < self.min_chars or not any(ch.isalpha() for ch in text):
+            result = {
+                "verdict": "ALLOW",
+                "confidence": 1.0,
+                "details": {"prefilter": "short_text"}
+            }
+            self._count("allow")
+        else:
+            result = None
+            self._count("pass")
+
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+            lexicons = {platform: len(lexicon) for platform, (_, lexicon) in self._lexicons.items()}
+        total = sum(counts.values())
+        return {
+            **counts,
+            "decided_rate": round((counts["block"] + counts["allow"]) / total, 4) if total else 0.0,
+            "lexicon_sizes": lexicons
+        }
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def _lexicon(self, platform: str) -> Optional[Lexicon]:
+        """Словарь платформы; файлы проверяются не чаще reload_interval"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._lexicons.get(platform)
+            if cached and now - self._checked_at.get(platform, 0) < self.reload_interval:
+                return cached[1]
+            self._checked_at[platform] = now
+
+        paths = [
+            path for path in (
+                self.lexicon_dir / f"{COMMON_LEXICON}.txt",
+                self.lexicon_dir / f"{platform}.txt"
+            )
+            if path.is_file()
+        ]
+        if not paths:
+            with self._lock:
+                self._lexicons.pop(platform, None)
+            return None
+
+        try:
+            signature = tuple((str(path), path.stat().st_mtime_ns) for path in paths)
+            if cached and cached[0] == signature:
+                return cached[1]
+            lexicon = Lexicon(paths)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.error(f"Не удалось загрузить словарь {platform}: {e}")
+            return cached[1] if cached else None
+
+        with self._lock:
+            self._lexicons[platform] = (signature, lexicon)
+        logger.info(f"Словарь префильтра {platform} {'перезагружен' if cached else 'загружен'}: {len(lexicon)} записей")
+        return lexicon
+
+
+prefilter = Prefilter(config.LEXICON_DIR, config.PREFILTER_MIN_CHARS, config.LEXICON_RELOAD_INTERVAL) if config.PREFILTER_ENABLED else None
@@ -0,0 +1,132 @@
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+import config
+
+logger = logging.getLogger(__name__)
+
+# как часто (в записях) подрезать SQLite до размера кэша
+_DISK_TRIM_EVERY = 100
+
+
+def normalize_text(text: str) -> str:
+    """Нормализация для ключа кэша: NFC и схлопывание пробелов (регистр важен для cased моделей)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_key(text: str, platform: str, model_fingerprint: str) -> str:
+    """Ключ кэша: хэш нормализованного текста, платформы и конфигурации моделей"""
+    digest = hashlib.sha256()
+    for part in (model_fingerprint, platform, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class VerdictCache:
+    """
+    LRU-кэш результатов проверки с необязательным хранением в SQLite.
+    Хранятся детальные оценки моделей, а не вердикт, поэтому после смены
+    порога запись пересуживается без повторного инференса.
+    """
+
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Максимальное количество записей
+            db_path: Путь к SQLite базе; None — только память
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._puts = 0
+
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("""
+                CREATE TABLE IF NOT EXISTS verdicts (
+                    key TEXT PRIMARY KEY,
+                    details TEXT NOT NULL,
+                    used_at REAL NOT NULL
+                )
+                """)
+            logger.info(f"Кэш вердиктов хранится в {self.db_path}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Детальные оценки из кэша или None"""
+        with self._lock:
+            details = self._entries.get(key)
+            if details is not None:
+                self._entries.move_to_end(key)
+
+        if details is None and self.db_path:
+            details = self._disk_get(key)
+            if details is not None:
+                self._remember(key, details)
+
+        return details
+
+    def put(self, key: str, details: Dict):
+        """Сохраняет детальные оценки"""
+        self._remember(key, details)
+
+        if self.db_path:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, details, used_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(details, ensure_ascii=False), time.time())
+                )
+                self._puts += 1
+                if self._puts % _DISK_TRIM_EVERY == 0:
+                    conn.execute(
+                        "DELETE FROM verdicts WHERE key NOT IN "
+                        "(SELECT key FROM verdicts ORDER BY used_at DESC LIMIT ?)",
+                        (self.max_entries,)
+                    )
+
+    def record(self, hit: bool):
+        """Учет попадания/промаха (запись может быть найдена, но непригодна для переиспользования)"""
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": bool(self.db_path)
+            }
+
+    def _remember(self, key: str, details: Dict):
+        with self._lock:
+            self._entries[key] = details
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[Dict]:
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute("SELECT details FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE verdicts SET used_at = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+
+verdict_cache = VerdictCache(config.VERDICT_CACHE_SIZE, config.VERDICT_CACHE_DB) if config.VERDICT_CACHE_ENABLED else None
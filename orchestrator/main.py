@@ -44,7 +44,8 @@ async def process_video(request: ProcessRequest):
         platforms=request.platforms, 
         post_format=request.post_format, 
         custom_prompt=request.custom_prompt,
-        pipeline_actions=request.pipeline_actions
+        pipeline_actions=request.pipeline_actions,
+        language=request.language
     )
     return job
     
@@ -15,6 +15,7 @@ class Job(BaseModel):
     status: JobStatus
     video_path: Optional[str] = None
     text: Optional[str] = None
+    language: Optional[str] = None  # язык транскрипта, определенный transcriber
     transcript_check: Optional[dict] = None  # проверка транскрипта
     generated_content: Optional[dict] = None  # ютуб + тг + проверки
     message: Optional[str] = None
@@ -25,4 +26,5 @@ class ProcessRequest(BaseModel):
     platforms: list[str] = ["youtube", "telegram"]
     post_format: str = "neutral"
     custom_prompt: Optional[str] = None
-    pipeline_actions: list[str] = []
\ No newline at end of file
+    pipeline_actions: list[str] = []
+    language: Optional[str] = None  # подсказка языка для transcriber
\ No newline at end of file
@@ -1,4 +1,5 @@
 import httpx
+import asyncio
 import logging
 from pathlib import Path
 import config
@@ -20,7 +21,27 @@ def _normalize_policy_platform(platform: str) -> str:
     return "youtube"
 
 
-async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["youtube", "telegram"], post_format: str = "neutral", custom_prompt: str = None, pipeline_actions: list[str] = None) -> Job:
+def _policy_text(content: dict) -> str:
+    """Текст сгенерированного контента для проверки политики: заголовок и описание или пост"""
+    return f"{content.get('title', '')} {content.get('description') or content.get('post') or ''}".strip()
+
+
+async def _check_policy(client: httpx.AsyncClient, job: Job, items: list[dict]) -> dict:
+    """Проверка политики одним запросом /check_policy/multi: {id: результат}, при ошибке — {}"""
+    logger.info(f"Запрос {job.id}: Проверка политики ({len(items)} текстов)...")
+    try:
+        check_response = await client.post(
+            f"{config.CHECKING_TERMS_URL}/check_policy/multi",
+            json={"items": items}
+        )
+        check_response.raise_for_status()
+        return {result.pop("id"): result for result in check_response.json()["results"]}
+    except Exception as e:
+        logger.error(f"Проверка политики: ошибка {e}")
+        return {}
+
+
+async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["youtube", "telegram"], post_format: str = "neutral", custom_prompt: str = None, pipeline_actions: list[str] = None, language: str = None) -> Job:
     """
     Полный пайплайн обработки видео с поддержкой выборочного выполнения шагов
     """
@@ -35,6 +56,7 @@ async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["
 
         async with httpx.AsyncClient(timeout=config.HTTP_TIMEOUT) as client:
             processed_video_path = str(input_path)
+            processed_audio_path = None
             
             # 1. Silence Cutter
             if "cut_silence" in pipeline_actions:
@@ -45,7 +67,9 @@ async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["
                         json={"file_path": str(input_path)}
                     )
                     silence_response.raise_for_status()
-                    processed_video_path = silence_response.json()["output_path"]
+                    silence_data = silence_response.json()
+                    processed_video_path = silence_data["output_path"]
+                    processed_audio_path = silence_data.get("audio_path")
                 except Exception as e:
                     logger.error(f"Silence Cutter: ошибка {e}")
             
@@ -57,40 +81,33 @@ async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["
                 try:
                     transcriber_response = await client.post(
                         f"{config.TRANSCRIBER_URL}/transcribe",
-                        json={"file_path": processed_video_path}
+                        json={"file_path": processed_video_path, "audio_path": processed_audio_path, "language": language}
                     )
                     transcriber_response.raise_for_status()
-                    transcription_text = transcriber_response.json()["text"]
-                    logger.info(f"Запрос {job.id}: Транскрибация получена, длина: {len(transcription_text)}")
+                    transcriber_data = transcriber_response.json()
+                    transcription_text = transcriber_data["text"]
+                    job.language = transcriber_data.get("language")
+                    logger.info(f"Запрос {job.id}: Транскрибация получена, длина: {len(transcription_text)}, язык: {job.language}")
                 except Exception as e:
                     logger.error(f"Транскрибер: ошибка {e}")
                     transcription_text = "Ошибка транскрибации"
             
-            # 3. Checking terms
+            # 3. Checking terms для транскрипта: сразу после транскрибации, параллельно с генерацией
+            transcript_check_task = None
             if "check_policy" in pipeline_actions and transcription_text:
                 # выбираем первую поддерживаемую платформу для политики
-                base_platform = None
-                for p in platforms or []:
-                    if p in SUPPORTED_POLICY_PLATFORMS:
-                        base_platform = p
-                        break
-                check_platform = _normalize_policy_platform(base_platform or "youtube")
-                logger.info(f"Запрос {job.id}: Проверка транскрипта...")
-                job.message = "Проверка политики..."
-                
-                tmp_file = config.PROCESSED_DIR / f"{job.id}_transcript.txt"
-                with open(tmp_file, "w", encoding="utf-8") as f:
-                    f.write(transcription_text)
+                base_platform = next((p for p in platforms or [] if p in SUPPORTED_POLICY_PLATFORMS), None)
+                transcript_item = {
+                    "id": "transcript",
+                    "text": transcription_text,
+                    "platform": _normalize_policy_platform(base_platform or "youtube")
+                }
 
-                try:
-                    transcript_check_response = await client.post(
-                        f"{config.CHECKING_TERMS_URL}/check_policy",
-                        json={"file_path": str(tmp_file), "platform": check_platform}
-                    )
-                    job.transcript_check = transcript_check_response.json()
-                except Exception as e:
-                    logger.error(f"Проверка политики: ошибка {e}")
+                async def check_transcript():
+                    job.transcript_check = (await _check_policy(client, job, [transcript_item])).get("transcript")
 
+                transcript_check_task = asyncio.create_task(check_transcript())
+            
             # 4. Text generator
             generated = {}
             if any(a in pipeline_actions for a in ["generate_content", "publish"]) and transcription_text:
@@ -103,7 +120,8 @@ async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["
                             "transcript": transcription_text,
                             "post_format": post_format,
                             "custom_prompt": custom_prompt,
-                            "platforms": platforms
+                            "platforms": platforms,
+                            "language": job.language
                         }
                     )
                     text_gen_response.raise_for_status()
@@ -112,28 +130,35 @@ async def process_pipeline(job: Job, input_path: Path, platforms: list[str] = ["
                 except Exception as e:
                     logger.error(f"Text Generator: ошибка {e}")
 
+            # 5. Checking terms: сгенерированные тексты всех платформ одним запросом
+            policy_results = {}
+            if "check_policy" in pipeline_actions and any(a in pipeline_actions for a in ["generate_content", "publish"]):
+                policy_items = [
+                    {
+                        "id": platform,
+                        "text": _policy_text(generated[platform]),
+                        "platform": _normalize_policy_platform(platform)
+                    }
+                    for platform in platforms
+                    if isinstance(generated.get(platform), dict)
+                ]
+                if policy_items:
+                    job.message = "Проверка политики..."
+                    policy_results = await _check_policy(client, job, policy_items)
+
+            if transcript_check_task is not None:
+                await transcript_check_task
             job.generated_content = {}
             
-            # 5. Platform specific, Thumbnails
+            # 6. Platform specific, Thumbnails
             for platform in platforms:
                 platform_data = {}
                 
                 if any(a in pipeline_actions for a in ["generate_content", "publish"]) and platform in generated and generated[platform] is not None:
                     platform_data["content"] = generated[platform]
                     
-                    if "check_policy" in pipeline_actions:
-                        platform_content = generated[platform]
-                        if isinstance(platform_content, dict):
-                            text_to_check = f"{platform_content.get('title', '')} {platform_content.get('description', '')}"
-                        try:
-                                policy_platform = _normalize_policy_platform(platform)
-                            check_res = await client.post(
-                                f"{config.CHECKING_TERMS_URL}/check_policy",
-                                    json={"text": text_to_check, "platform": policy_platform}
-                            )
-                            platform_data["policy_check"] = check_res.json()
-                        except Exception as e:
-                            logger.debug(f"Проверка политики пропущена для {platform}: {e}")
+                    if platform in policy_results:
+                        platform_data["policy_check"] = policy_results[platform]
 
                 if platform == "youtube" and "generate_thumbnails" in pipeline_actions:
                     logger.info(f"Задание {job.id}: Генерация обложек...")
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 
 class VideoResponse(BaseModel):
@@ -6,6 +7,7 @@ class VideoResponse(BaseModel):
     Модель ответа с результатом обработки видео
     """
     output_path: str
+    audio_path: Optional[str] = None  # .wav 16 kHz моно для транскрибера
 
 
 class FileRequest(BaseModel):
@@ -19,7 +19,7 @@ async def process_file(request: FileRequest):
     Args:
         request: Запрос с путем к файлу
     Returns:
-        Путь к обработанному видео
+        Путь к обработанному видео и его аудио
     """
     logger.info(f"Получен запрос process_file для {request.file_path}")
     
@@ -30,11 +30,12 @@ async def process_file(request: FileRequest):
             raise HTTPException(status_code=404, detail=f"Файл не найден: {request.file_path}")
         
         logger.info(f"Начало обработки файла: {request.file_path}")
-        output_path = await silence_cutter.process(request.file_path)
+        output_path, audio_path = await silence_cutter.process(request.file_path)
         logger.info(f"Обработка завершена, результат: {output_path}")
         
         return VideoResponse(
-            output_path=output_path
+            output_path=output_path,
+            audio_path=audio_path
         )
     
     except Exception as e:
@@ -35,39 +35,57 @@ class SilenceCutter:
             f"min_silence_len={self.min_silence_len}ms"
         )
     
-    async def process(self, input_path: str) -> str:
+    async def process(self, input_path: str) -> Tuple[str, str]:
         """
         Главный метод удаления пауз
         Args:
             input_path: Путь к видеофайлу
         Returns:
-            Путь к обработанному видео без пауз
+            Пути к обработанному видео без пауз и к его аудио (.wav 16 kHz, моно)
         """
         logger.info(f"Начало удаления пауз: {input_path}")
         audio_path = extract_audio(input_path)
+        audio = AudioSegment.from_wav(audio_path)
         
-        segments = self._find_non_silent_chunks(audio_path)
+        segments = self._find_non_silent_chunks(audio)
         logger.info(f"Найдено {len(segments)} активных сегментов")
         
         chunk_files = cut_video_segments(input_path, segments, self.workdir)
         
         output_video = concat_videos(chunk_files, self.workdir)
+        output_audio = self._export_audio(audio, segments, output_video + ".wav")
         
         logger.info(f"Обработка завершена: {output_video}")
-        return output_video
+        return output_video, output_audio
     
-    def _find_non_silent_chunks(self, audio_path: str) -> List[Tuple[float, float]]:
+    def _export_audio(self, audio: AudioSegment, segments: List[Tuple[float, float]], output_path: str) -> str:
         """
-        Находит участки без тишины в аудио файле
+        Склеивает аудио активных сегментов, чтобы транскрибер не декодировал видео повторно
         Args:
-            audio_path: Путь к аудио файлу
+            audio: Уже загруженное аудио исходного видео
+            segments: Список кортежей (start, end) в секундах
+            output_path: Путь к итоговому .wav
+        Returns:
+            Путь к аудио обработанного видео
+        """
+        result = AudioSegment.empty()
+        for start, end in segments:
+            result += audio[int(start * 1000):int(end * 1000)]
+        
+        result.export(output_path, format="wav")
+        logger.info(f"Аудио без пауз сохранено: {output_path}")
+        return output_path
+    
+    def _find_non_silent_chunks(self, audio: AudioSegment) -> List[Tuple[float, float]]:
+        """
+        Находит участки без тишины в аудио
+        Args:
+            audio: Загруженное аудио
         Returns:
             Список кортежей (start, end) в секундах для активных сегментов
         """
         logger.info("Анализ аудио для обнаружения тишины")
         
-        audio = AudioSegment.from_wav(audio_path)
-        
         silent_ranges = silence.detect_silence(
             audio,
             min_silence_len=self.min_silence_len,
@@ -0,0 +1,242 @@
+"""
+Офлайн бенчмарк генерации: прогоняет корпус транскриптов через bulk_generate_content
+и сохраняет метрики скорости и качества JSON в файл для сравнения между моделями и настройками.
+
+Корпус — директория с .txt (текст транскрипта) и .json (поле "transcript" или "text",
+необязательное "language"; подходят записи кэша transcriber).
+
+Запуск из директории сервиса:
+    python benchmark.py --corpus /data/benchmark_corpus --output results/q4_k_m.json
+    python benchmark.py --corpus ./corpus --model /app/llm_models/qwen2-7b-instruct-q4_k_m.gguf --n-batch 512 --threads 8
+
+Скорость prompt eval и генерации берется из счетчиков контекста llama.cpp
+(llama_perf_context), сбрасываемых перед каждым прогоном: учитываются только реально
+вычисленные токены, а не восстановленные из кэша. Кэш промтов по умолчанию выключен
+(--prompt-cache включает его). Map-reduce сжатие длинного транскрипта замеряется
+отдельно и не входит в TTFT и скорость prompt eval.
+"""
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import llama_cpp
+import config
+from services.generator import create_llm, bulk_generate_content, fits_context, prepare_transcript, json_parse_stats
+from services.draft_model import speculative_stats
+from services.result_cache import model_identity
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def load_corpus(corpus_dir: str, limit: Optional[int] = None) -> List[Dict]:
+    """Транскрипты корпуса: [{"name", "transcript", "language"}], по имени файла"""
+    samples = []
+    for path in sorted(Path(corpus_dir).iterdir()):
+        if path.suffix == ".txt":
+            samples.append({"name": path.name, "transcript": path.read_text(encoding="utf-8"), "language": None})
+        elif path.suffix == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            transcript = data.get("transcript") or data.get("text")
+            if not transcript:
+                logger.warning(f"{path.name}: нет поля transcript/text, пропущен")
+                continue
+            samples.append({"name": path.name, "transcript": transcript, "language": data.get("language")})
+        if limit and len(samples) >= limit:
+            break
+    return samples
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return round(ordered[index], 3)
+
+
+def perf_counters(model) -> Dict:
+    """Счетчики prompt eval и генерации контекста с последнего сброса"""
+    perf = llama_cpp.llama_perf_context(model.ctx)
+    return {
+        "prompt_eval_tokens": perf.n_p_eval,
+        "prompt_eval_ms": perf.t_p_eval_ms,
+        "eval_tokens": perf.n_eval,
+        "eval_ms": perf.t_eval_ms
+    }
+
+
+def run_sample(model, sample: Dict, platforms: List[str], post_format: str) -> Dict:
+    """
+    Одна генерация: сначала отдельно сжатие транскрипта (если не помещается в контекст),
+    затем генерация с замером времени до первого токена и счетчиков llama.cpp
+    """
+    transcript, language = sample["transcript"], sample["language"]
+    map_reduce = None
+    if not fits_context(transcript, platforms, post_format, language=language, model=model):
+        llama_cpp.llama_perf_context_reset(model.ctx)
+        map_reduce_started = time.perf_counter()
+        transcript, language = prepare_transcript(transcript, platforms, post_format, language=language, model=model)
+        map_reduce = {"seconds": round(time.perf_counter() - map_reduce_started, 3), **perf_counters(model)}
+
+    parts = []
+    first_token_at = None
+
+    def on_token(text: str):
+        nonlocal first_token_at
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        parts.append(text)
+
+    llama_cpp.llama_perf_context_reset(model.ctx)
+    json_before = json_parse_stats()
+    started = time.perf_counter()
+    result = bulk_generate_content(
+        transcript,
+        platforms,
+        post_format,
+        language=language,
+        model=model,
+        on_token=on_token
+    )
+    finished = time.perf_counter()
+    json_after = json_parse_stats()
+    perf = perf_counters(model)
+
+    output = "".join(parts)
+    completion_tokens = len(model.tokenize(output.encode("utf-8"), add_bos=False)) if output else 0
+    # в контексте после ответа: промт + сгенерированные токены; вычислено из них —
+    # только prompt_eval_tokens, остальное взято из KV кэша
+    prompt_tokens = max(0, model.n_tokens - completion_tokens)
+    ttft = (first_token_at or finished) - started
+
+    return {
+        "name": sample["name"],
+        "latency": round(finished - started, 3),
+        "ttft": round(ttft, 3),
+        "map_reduce": map_reduce,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        **perf,
+        "prompt_tokens_per_sec": round(perf["prompt_eval_tokens"] / perf["prompt_eval_ms"] * 1000, 2) if perf["prompt_eval_ms"] > 0 else None,
+        "generation_tokens_per_sec": round(perf["eval_tokens"] / perf["eval_ms"] * 1000, 2) if perf["eval_ms"] > 0 else None,
+        "json_outcome": next((outcome for outcome in json_after if json_after[outcome] > json_before[outcome]), None),
+        "content_complete": all(result.get(platform) for platform in platforms)
+    }
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    """Сводные метрики по всем прогонам"""
+    total = len(runs)
+    outcomes = {outcome: sum(1 for run in runs if run["json_outcome"] == outcome) for outcome in ("valid", "fixed", "repaired", "failed")}
+    prompt_ms = sum(run["prompt_eval_ms"] for run in runs)
+    eval_ms = sum(run["eval_ms"] for run in runs)
+    latencies = [run["latency"] for run in runs]
+    ttfts = [run["ttft"] for run in runs]
+    map_reduce_times = [run["map_reduce"]["seconds"] for run in runs if run["map_reduce"]]
+    return {
+        "samples": total,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "ttft_p50": percentile(ttfts, 50),
+        "ttft_p95": percentile(ttfts, 95),
+        "prompt_tokens_per_sec": round(sum(run["prompt_eval_tokens"] for run in runs) / prompt_ms * 1000, 2) if prompt_ms > 0 else None,
+        "generation_tokens_per_sec": round(sum(run["eval_tokens"] for run in runs) / eval_ms * 1000, 2) if eval_ms > 0 else None,
+        "map_reduce_samples": len(map_reduce_times),
+        "map_reduce_p50": percentile(map_reduce_times, 50),
+        "map_reduce_p95": percentile(map_reduce_times, 95),
+        "json_valid_rate": round(outcomes["valid"] / total, 4) if total else None,
+        "json_outcomes": outcomes,
+        "repair_rate": round((outcomes["fixed"] + outcomes["repaired"]) / total, 4) if total else None,
+        "content_complete_rate": round(sum(run["content_complete"] for run in runs) / total, 4) if total else None
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк скорости и качества генерации text_generator")
+    parser.add_argument("--corpus", required=True, help="директория с транскриптами (.txt, .json)")
+    parser.add_argument("--output", default="benchmark.json", help="файл результатов (JSON)")
+    parser.add_argument("--model", default=config.MODEL_PATH, help="путь к GGUF модели")
+    parser.add_argument("--threads", type=int, default=config.N_THREADS)
+    parser.add_argument("--n-batch", type=int, default=config.N_BATCH)
+    parser.add_argument("--n-ctx", type=int, default=config.N_CTX)
+    parser.add_argument("--platforms", nargs="+", default=["youtube", "telegram"])
+    parser.add_argument("--post-format", default="neutral")
+    parser.add_argument("--limit", type=int, default=None, help="сколько транскриптов взять из корпуса")
+    parser.add_argument("--repeat", type=int, default=1, help="сколько раз прогнать корпус")
+    parser.add_argument("--warmup", type=int, default=1, help="прогонов первого транскрипта без учета в метриках")
+    parser.add_argument("--prompt-cache", choices=["ram", "disk"], default=None, help="включить кэш промтов (по умолчанию выключен)")
+    args = parser.parse_args()
+
+    samples = load_corpus(args.corpus, args.limit)
+    if not samples:
+        logger.error(f"В {args.corpus} нет транскриптов")
+        return 1
+
+    # create_llm берет параметры из config
+    config.N_THREADS = args.threads
+    config.N_BATCH = args.n_batch
+    config.N_CTX = args.n_ctx
+    config.PROMPT_CACHE = args.prompt_cache or "none"
+
+    logger.info(f"Загрузка модели {args.model}...")
+    load_started = time.perf_counter()
+    model = create_llm(args.model)
+    load_seconds = round(time.perf_counter() - load_started, 2)
+
+    for _ in range(args.warmup):
+        run_sample(model, samples[0], args.platforms, args.post_format)
+
+    runs = []
+    for iteration in range(args.repeat):
+        for sample in samples:
+            run = run_sample(model, sample, args.platforms, args.post_format)
+            run["iteration"] = iteration
+            runs.append(run)
+            logger.info(f"{sample['name']}: {run['latency']} сек, TTFT {run['ttft']} сек, JSON: {run['json_outcome']}")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "model": model_identity(args.model),
+            "draft_model": config.DRAFT_MODEL_PATH or None,
+            "n_ctx": config.N_CTX,
+            "n_threads": config.N_THREADS,
+            "n_batch": config.N_BATCH,
+            "n_gpu_layers": config.N_GPU_LAYERS,
+            "max_tokens": config.MAX_TOKENS,
+            "temperature": config.TEMPERATURE,
+            "top_p": config.TOP_P,
+            "grammar": config.GRAMMAR_ENABLED,
+            "prompt_cache": config.PROMPT_CACHE,
+            "map_reduce": config.MAP_REDUCE_ENABLED,
+            "platforms": args.platforms,
+            "post_format": args.post_format,
+            "corpus": str(Path(args.corpus).resolve()),
+            "repeat": args.repeat,
+            "warmup": args.warmup
+        },
+        "load_seconds": load_seconds,
+        "summary": summarize(runs),
+        "speculative": speculative_stats([model.draft_model]),
+        "runs": runs
+    }
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"✅ Результаты сохранены: {output_path}")
+    logger.info(json.dumps(report["summary"], ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,97 @@ import os
 MODEL_PATH = os.getenv("MODEL_PATH", "/app/llm_models/qwen2.5-1.5b-instruct-q4_k_m.gguf") # более легкая
 # MODEL_PATH = os.getenv("MODEL_PATH", "/app/llm_models/qwen2-7b-instruct-q4_k_m.gguf")
 
+# бэкенд LLM:
+# server — llama.cpp server (llama-server --parallel N --cont-batching): последовательности
+#   одновременных запросов декодируются одним батчем в общем KV кэше, веса загружены один раз;
+# local — llama-cpp-python в процессе: по контексту на слот, без батчинга между слотами
+LLM_BACKEND = os.getenv("LLM_BACKEND", "local")
+LLM_SERVER_URL = os.getenv("LLM_SERVER_URL", "http://llm_server:8080")
+LLM_SERVER_TIMEOUT = float(os.getenv("LLM_SERVER_TIMEOUT", "600"))  # сек на ответ
+LLM_SERVER_STARTUP_TIMEOUT = float(os.getenv("LLM_SERVER_STARTUP_TIMEOUT", "300"))  # сек на загрузку модели сервером
+
+# тиры моделей: "<тир>:<путь к GGUF>,...", например "fast:/app/llm_models/qwen2.5-1.5b-instruct-q4_k_m.gguf,quality:/app/llm_models/qwen2-7b-instruct-q4_k_m.gguf";
+# для LLM_BACKEND=server вместо пути — адрес сервера ("fast:http://llm_fast:8080").
+# Тир DEFAULT_MODEL_TIER без явного пути — MODEL_PATH (или LLM_SERVER_URL). Запрос выбирает тир полем model_tier
+DEFAULT_MODEL_TIER = os.getenv("DEFAULT_MODEL_TIER", "default")
+MODEL_TIERS = os.getenv("MODEL_TIERS", "")
+
+
+def _model_tiers(value: str) -> dict:
+    tiers = {name.strip(): path.strip() for name, path in (item.split(":", 1) for item in value.split(",") if item.strip())}
+    tiers.setdefault(DEFAULT_MODEL_TIER, LLM_SERVER_URL if LLM_BACKEND == "server" else MODEL_PATH)
+    return tiers
+
+
+MODEL_TIER_PATHS = _model_tiers(MODEL_TIERS)
+
+# модели загружаются при первом запросе к тиру и выгружаются после MODEL_IDLE_TTL сек простоя
+# (0 — не выгружать). Тиры из PRELOAD_TIERS загружаются при старте и не выгружаются
+PRELOAD_TIERS = [tier.strip() for tier in os.getenv("PRELOAD_TIERS", DEFAULT_MODEL_TIER).split(",") if tier.strip()]
+MODEL_IDLE_TTL = float(os.getenv("MODEL_IDLE_TTL", "900"))
+# закрепить веса в RAM (mlock): без вытеснения страниц, но и без экономии на простое
+MODEL_MLOCK = os.getenv("MODEL_MLOCK", "false").lower() == "true"
+
+# спекулятивное декодирование: маленькая черновая модель с тем же словарем
+# (например, qwen2.5-0.5b-instruct для qwen2-7b-instruct) предлагает токены,
+# основная модель проверяет их пачкой. Пусто — выключено
+DRAFT_MODEL_PATH = os.getenv("DRAFT_MODEL_PATH", "")  # "/app/llm_models/qwen2.5-0.5b-instruct-q4_k_m.gguf"
+DRAFT_NUM_PRED_TOKENS = int(os.getenv("DRAFT_NUM_PRED_TOKENS", "8"))
+
 # параметры LLM
 N_CTX = int(os.getenv("N_CTX", "4096"))
 N_THREADS = int(os.getenv("N_THREADS", "6"))
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "-1"))
+N_BATCH = int(os.getenv("N_BATCH", "128"))  # токенов промта за один проход
+
+# слоты генерации — сколько запросов одновременно уходит в модель.
+# server: должно совпадать с --parallel сервера, сервер декодирует их одним батчем.
+# local: каждый слот — отдельный контекст со своим потоком, декодирование не батчится,
+# N_THREADS делится между слотами, а на GPU каждый слот держит свою копию весов в VRAM,
+# поэтому больше 1 слота дает только перекрытие очереди, но не рост пропускной способности
+LLM_SLOTS = int(os.getenv("LLM_SLOTS", "1"))
+GENERATION_QUEUE_SIZE = int(os.getenv("GENERATION_QUEUE_SIZE", "16"))  # сверх — 503 с Retry-After
+DISCONNECT_POLL_INTERVAL = 1.0  # сек
 
 # параметры генерации
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "2048"))
 TEMPERATURE = float(os.getenv("TEMPERATURE", "0.1"))
 TOP_P = float(os.getenv("TOP_P", "0.8"))
 
+# combined — все платформы одним ответом; per_platform — по запросу на платформу,
+# запросы идут параллельно в разных слотах, у каждой платформы свой лимит токенов;
+# auto — per_platform, если свободных слотов хватает на все платформы, иначе combined
+# (при одном слоте запросы платформ шли бы друг за другом, каждый со своим prompt eval).
+# Потоковая генерация /generate/stream всегда идет одним ответом
+GENERATION_MODE = os.getenv("GENERATION_MODE", "auto")
+PLATFORM_MAX_TOKENS = {
+    "youtube": int(os.getenv("YOUTUBE_MAX_TOKENS", "400")),  # заголовок, описание до 300 симв, 7 тегов
+    "telegram": int(os.getenv("TELEGRAM_MAX_TOKENS", "1000")),  # заголовок и пост до 3500 симв
+}
+
+# длинные транскрипты: если текст не помещается в N_CTX вместе с промтом и
+# GENERATION_RESERVE_TOKENS на ответ, он сжимается map-reduce суммаризацией по частям
+MAP_REDUCE_ENABLED = os.getenv("MAP_REDUCE_ENABLED", "true").lower() == "true"
+GENERATION_RESERVE_TOKENS = int(os.getenv("GENERATION_RESERVE_TOKENS", "1024"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "384"))
+MAP_REDUCE_MAX_DEPTH = int(os.getenv("MAP_REDUCE_MAX_DEPTH", "3"))
+
+# ограниченное декодирование: грамматика из схем YouTubeContent/TelegramContent,
+# ответ модели всегда валидный JSON (восстановление нужно только при обрыве по MAX_TOKENS)
+GRAMMAR_ENABLED = os.getenv("GRAMMAR_ENABLED", "true").lower() == "true"
+
+# кэш промтов: состояние (KV) общего префикса промта переиспользуется между запросами
+# none, ram или disk (disk переживает перезапуск контейнера)
+PROMPT_CACHE = os.getenv("PROMPT_CACHE", "ram")
+PROMPT_CACHE_DIR = os.getenv("PROMPT_CACHE_DIR", "/data/llm_prompt_cache")
+PROMPT_CACHE_MB = int(os.getenv("PROMPT_CACHE_MB", "1024"))
+PROMPT_CACHE_WARMUP = os.getenv("PROMPT_CACHE_WARMUP", "true").lower() == "true"
+
+# кэш готовых ответов по хэшу транскрипта, формата, промта, платформ и файла модели
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1000"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))  # сек
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "") or None  # дисковый слой, например /data/generation_cache
+
 # логирование
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -1,12 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import logging
+from typing import Optional
 import uvicorn
 import config
 from models import GenerateRequest, GenerateResponse, YouTubeContent, TelegramContent
 from services import (
-    load_llm,
-    bulk_generate_content
+    bulk_generate_content,
+    content_budget,
+    count_tokens,
+    truncate_tokens,
+    split_for_summary,
+    summarize_chunk,
+    clean_field,
+    json_parse_stats,
+    PLATFORM_MODELS,
+    model_manager,
+    UnknownTierError,
+    QueueFullError,
+    GenerationCancelled,
+    JsonFieldParser,
+    result_cache,
+    make_key,
+    speculative_stats
 )
+from services.scheduler import GenerationScheduler
 
 logging.basicConfig(
     level=getattr(logging, config.LOG_LEVEL),
@@ -23,14 +43,252 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup_event():
-    """Загрузка LLM при старте сервиса"""
+    """Загрузка закрепленных тиров LLM при старте сервиса, остальные — при первом запросе"""
     logger.info("Запуск Text Generator...")
-    load_llm()
+    await asyncio.to_thread(model_manager.start)
     logger.info("Text Generator готов к работе")
 
 
+async def acquire_scheduler(tier: Optional[str]) -> GenerationScheduler:
+    """
+    Планировщик слотов тира модели; загрузка модели идет вне event loop
+    Raises:
+        HTTPException: 400, если тир неизвестен
+    """
+    try:
+        return await asyncio.to_thread(model_manager.acquire, tier)
+    except UnknownTierError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+
+
+def submit_job(scheduler: GenerationScheduler, fn, *args, label: str = "", **kwargs):
+    """
+    Ставит генерацию в очередь планировщика
+    Raises:
+        HTTPException: 503 с Retry-After, если очередь заполнена
+    """
+    try:
+        return scheduler.submit(fn, *args, label=label, **kwargs)
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(scheduler.retry_after())}
+        )
+
+
+async def run_in_slot(http_request: Request, tier: Optional[str], fn, *args, label: str = "", **kwargs):
+    """
+    Выполняет генерацию в свободном слоте тира модели, не блокируя event loop.
+    При отключении клиента задача снимается с очереди или прерывается на следующем токене.
+    Raises:
+        HTTPException: 503 с Retry-After, если очередь заполнена; 499, если клиент отключился
+    """
+    scheduler = await acquire_scheduler(tier)
+    job = submit_job(scheduler, fn, *args, label=label, **kwargs)
+    logger.info(f"Задача {job.id} в очереди, позиция: {scheduler.position(job)}")
+    future = asyncio.wrap_future(job.future)
+
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=config.DISCONNECT_POLL_INTERVAL)
+        if done:
+            try:
+                return future.result()
+            except (GenerationCancelled, asyncio.CancelledError):
+                raise HTTPException(status_code=499, detail="Клиент отключился")
+
+        if await http_request.is_disconnected():
+            scheduler.cancel(job)
+            logger.info(f"Клиент отключился, задача {job.id} отменена")
+            raise HTTPException(status_code=499, detail="Клиент отключился")
+
+
+async def condense_transcript(http_request: Request, request: GenerateRequest, scheduler: GenerationScheduler):
+    """
+    Сжимает транскрипт, не помещающийся в контекст, map-reduce суммаризацией.
+    Деление на части и подсчет токенов — только токенизация, идут вне слотов;
+    каждая часть излагается отдельной задачей планировщика, части обрабатываются
+    параллельно свободными слотами, reduce — после готовности всех частей.
+    Изложение на русском, поэтому язык сбрасывается.
+    Returns:
+        (текст для промта, язык текста)
+    """
+    transcript, language = request.transcript, request.language
+    if not config.MAP_REDUCE_ENABLED:
+        return transcript, language
+
+    model = scheduler.models[0]
+    platforms = [p for p in request.platforms if p in PLATFORM_MODELS]
+    budget = await asyncio.to_thread(
+        content_budget,
+        platforms,
+        request.post_format,
+        request.custom_prompt,
+        language,
+        model=model
+    )
+    for depth in range(config.MAP_REDUCE_MAX_DEPTH):
+        if await asyncio.to_thread(count_tokens, transcript, model=model) <= budget:
+            return transcript, language if depth == 0 else None
+
+        chunks = await asyncio.to_thread(split_for_summary, transcript, model=model)
+        summaries = await asyncio.gather(*(
+            run_in_slot(
+                http_request,
+                request.model_tier,
+                summarize_chunk,
+                chunk,
+                i,
+                len(chunks),
+                label=f"{request.post_format}: сжатие, часть {i} из {len(chunks)}"
+            )
+            for i, chunk in enumerate(chunks, start=1)
+        ), return_exceptions=True)
+        errors = [s for s in summaries if isinstance(s, BaseException)]
+        if errors:
+            disconnected = next((e for e in errors if isinstance(e, HTTPException) and e.status_code == 499), None)
+            raise disconnected or errors[0]
+        transcript = "\n\n".join(s for s in summaries if s)
+        if len(chunks) == 1:
+            break
+
+    if await asyncio.to_thread(count_tokens, transcript, model=model) > budget:
+        logger.warning("Изложение не поместилось в контекст, обрезается")
+        transcript = await asyncio.to_thread(truncate_tokens, transcript, budget, model=model)
+    return transcript, None
+
+
+def use_per_platform(request: GenerateRequest, scheduler: GenerationScheduler) -> bool:
+    """
+    Генерировать ли платформы отдельными запросами (GENERATION_MODE).
+    В режиме auto — только если каждой платформе достанется свободный слот,
+    иначе запросы выстроились бы в очередь и один ответ на все платформы быстрее.
+    """
+    if config.GENERATION_MODE != "auto":
+        return config.GENERATION_MODE == "per_platform"
+    platforms = [p for p in request.platforms if p in PLATFORM_MODELS]
+    return len(platforms) > 1 and scheduler.free_slots() >= len(platforms)
+
+
+async def generate_per_platform(http_request: Request, request: GenerateRequest, transcript: str, language: Optional[str]) -> dict:
+    """
+    Генерация по отдельному запросу на платформу: у каждой своя схема ответа
+    и свой лимит токенов, запросы выполняются параллельно в разных слотах.
+    Ошибка одной платформы не отменяет остальные.
+    """
+    platforms = [p for p in request.platforms if p in PLATFORM_MODELS]
+    if not platforms:
+        return {}
+
+    results = await asyncio.gather(*(
+        run_in_slot(
+            http_request,
+            request.model_tier,
+            bulk_generate_content,
+            transcript,
+            [platform],
+            request.post_format,
+            request.custom_prompt,
+            language,
+            label=f"{request.post_format}: {platform}",
+            max_tokens=config.PLATFORM_MAX_TOKENS.get(platform, config.MAX_TOKENS)
+        )
+        for platform in platforms
+    ), return_exceptions=True)
+
+    generated_data = {}
+    errors = []
+    for platform, result in zip(platforms, results):
+        if isinstance(result, BaseException):
+            logger.error(f"Ошибка генерации для {platform}: {result}")
+            errors.append(result)
+        else:
+            generated_data[platform] = result.get(platform)
+
+    disconnected = next((e for e in errors if isinstance(e, HTTPException) and e.status_code == 499), None)
+    if disconnected:
+        raise disconnected
+    if len(errors) == len(platforms):
+        raise errors[0]
+    return generated_data
+
+
+def build_response(request: GenerateRequest, generated_data: dict) -> GenerateResponse:
+    """Ответ с контентом только для запрошенных платформ"""
+    youtube = None
+    telegram = None
+
+    if "youtube" in request.platforms and generated_data.get("youtube"):
+        yt = generated_data["youtube"]
+        youtube = YouTubeContent(
+            title=yt.get("title", ""),
+            description=yt.get("description", ""),
+            tags=yt.get("tags", [])
+        )
+    
+    if "telegram" in request.platforms and generated_data.get("telegram"):
+        tg = generated_data["telegram"]
+        telegram = TelegramContent(
+            title=tg.get("title", ""),
+            post=tg.get("post", "")
+        )
+    
+    if youtube or telegram:
+        logger.info("Контент успешно сгенерирован")
+    else:
+        logger.warning("Контент не был сгенерирован для выбранных платформ")
+    
+    return GenerateResponse(youtube=youtube, telegram=telegram)
+
+
+def cached_response(request: GenerateRequest) -> Optional[GenerateResponse]:
+    """Готовый ответ из кэша или None (кэш выключен, regenerate или промах)"""
+    if not result_cache or request.regenerate:
+        return None
+    cached = result_cache.get(cache_key(request))
+    if cached is None:
+        return None
+    logger.info("Ответ взят из кэша генерации")
+    return GenerateResponse(**cached, cached=True)
+
+
+def store_response(request: GenerateRequest, response: GenerateResponse):
+    """
+    Сохраняет ответ в кэш, только если контент есть для всех запрошенных платформ:
+    частичный результат (ошибка одной из платформ) не должен отдаваться из кэша
+    """
+    platforms = [p for p in request.platforms if p in PLATFORM_MODELS]
+    if result_cache and platforms and all(getattr(response, p) for p in platforms):
+        result_cache.put(cache_key(request), response.model_dump(exclude={"cached"}))
+
+
+def cache_key(request: GenerateRequest) -> str:
+    """
+    Raises:
+        HTTPException: 400, если тир модели неизвестен
+    """
+    try:
+        model_path = model_manager.model_path(request.model_tier)
+    except UnknownTierError as e:
+        raise HTTPException(status_code=400, detail=e.args[0])
+    return make_key(
+        request.transcript,
+        request.post_format,
+        request.custom_prompt,
+        request.platforms,
+        request.language,
+        model_path
+    )
+
+
+def sse_event(event: str, data) -> str:
+    """Событие Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @app.post("/generate", response_model=GenerateResponse)
-async def generate_content(request: GenerateRequest):
+async def generate_content(request: GenerateRequest, http_request: Request):
     """
     Генерация контента для YouTube и Telegram
     
@@ -40,45 +298,146 @@ async def generate_content(request: GenerateRequest):
         Сгенерированный контент для обеих платформ
     """
     try:
-        logger.info(f"Генерация контента, формат: {request.post_format}, платформы: {request.platforms}")
-        
-        generated_data = bulk_generate_content(
-            request.transcript, 
-            request.platforms, 
-            request.post_format, 
-            request.custom_prompt
-        )
+        logger.info(f"Генерация контента, формат: {request.post_format}, платформы: {request.platforms}, язык: {request.language}")
         
-        youtube = None
-        telegram = None
-
-        if "youtube" in request.platforms and generated_data.get("youtube"):
-            yt = generated_data["youtube"]
-            youtube = YouTubeContent(
-                title=yt.get("title", ""),
-                description=yt.get("description", ""),
-                tags=yt.get("tags", [])
-            )
+        response = cached_response(request)
+        if response:
+            return response
         
-        if "telegram" in request.platforms and generated_data.get("telegram"):
-            tg = generated_data["telegram"]
-            telegram = TelegramContent(
-                title=tg.get("title", ""),
-                post=tg.get("post", "")
-            )
+        # длинный транскрипт сжимается один раз, а не в каждой задаче генерации
+        scheduler = await acquire_scheduler(request.model_tier)
+        transcript, language = await condense_transcript(http_request, request, scheduler)
         
-        if youtube or telegram:
-        logger.info("Контент успешно сгенерирован")
+        if use_per_platform(request, scheduler):
+            generated_data = await generate_per_platform(http_request, request, transcript, language)
         else:
-            logger.warning("Контент не был сгенерирован для выбранных платформ")
+            generated_data = await run_in_slot(
+                http_request,
+                request.model_tier,
+                bulk_generate_content,
+                transcript, 
+                request.platforms, 
+                request.post_format, 
+                request.custom_prompt,
+                language,
+                label=f"{request.post_format}: {', '.join(request.platforms)}"
+            )
         
-        return GenerateResponse(youtube=youtube, telegram=telegram)
+        response = build_response(request, generated_data)
+        store_response(request, response)
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Ошибка генерации: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/generate/stream")
+async def generate_content_stream(request: GenerateRequest, http_request: Request):
+    """
+    Потоковая генерация контента (Server-Sent Events)
+    
+    События:
+        token — очередной фрагмент ответа модели: {"text"}
+        field — поле платформы готово: {"platform", "field", "value"}
+        result — итоговый GenerateResponse
+        error — ошибка генерации: {"detail"}
+    """
+    logger.info(f"Потоковая генерация, формат: {request.post_format}, платформы: {request.platforms}, язык: {request.language}")
+    
+    response = cached_response(request)
+    if response:
+        async def cached_stream():
+            yield sse_event("result", response.model_dump())
+        return StreamingResponse(cached_stream(), media_type="text/event-stream")
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def on_token(text: str):
+        loop.call_soon_threadsafe(events.put_nowait, text)
+    
+    # сжатие и постановка в очередь до начала ответа, чтобы переполнение вернулось как 503
+    scheduler = await acquire_scheduler(request.model_tier)
+    transcript, language = await condense_transcript(http_request, request, scheduler)
+    job = submit_job(
+        scheduler,
+        bulk_generate_content,
+        transcript,
+        request.platforms,
+        request.post_format,
+        request.custom_prompt,
+        language,
+        label=f"stream {request.post_format}: {', '.join(request.platforms)}",
+        on_token=on_token
+    )
+    job.future.add_done_callback(lambda _: loop.call_soon_threadsafe(events.put_nowait, None))
+    
+    async def event_stream():
+        parser = JsonFieldParser()
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(events.get(), timeout=config.DISCONNECT_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        scheduler.cancel(job)
+                        logger.info(f"Клиент отключился, задача {job.id} отменена")
+                        return
+                    continue
+                
+                if text is None:
+                    break
+                yield sse_event("token", {"text": text})
+                for platform, field, value in parser.feed(text):
+                    if platform in request.platforms:
+                        yield sse_event("field", {
+                            "platform": platform,
+                            "field": field,
+                            "value": clean_field(platform, field, value)
+                        })
+            
+            try:
+                generated_data = job.future.result()
+            except Exception as e:
+                logger.error(f"Ошибка потоковой генерации: {e}", exc_info=True)
+                yield sse_event("error", {"detail": str(e)})
+                return
+            response = build_response(request, generated_data)
+            store_response(request, response)
+            yield sse_event("result", response.model_dump())
+        finally:
+            # генератор закрыт (клиент ушел) до завершения — останавливаем генерацию
+            if not job.future.done():
+                scheduler.cancel(job)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/queue")
+async def queue_status():
+    """Состояние слотов генерации и очереди по тирам моделей"""
+    return model_manager.queues()
+
+
+@app.get("/models")
+async def models_status():
+    """Тиры моделей и состояние их загрузки"""
+    return model_manager.status()
+
+
+@app.get("/stats")
+async def get_stats():
+    """Метрики кэша генерации, разбора JSON ответа и спекулятивного декодирования"""
+    return {
+        "result_cache": result_cache.stats() if result_cache else None,
+        "json_parse": json_parse_stats(),
+        "speculative": speculative_stats([model.draft_model for model in model_manager.loaded_models()])
+    }
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "text_generator"}
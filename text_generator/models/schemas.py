@@ -7,6 +7,9 @@ class GenerateRequest(BaseModel):
     post_format: str = "neutral"
     custom_prompt: Optional[str] = None
     platforms: List[str] = ["youtube", "telegram"]
+    language: Optional[str] = None  # язык транскрипта (код whisper: ru, en, ...)
+    regenerate: bool = False  # игнорировать кэш и сгенерировать заново
+    model_tier: Optional[str] = None  # тир модели из MODEL_TIERS, по умолчанию DEFAULT_MODEL_TIER
 
 
 class YouTubeContent(BaseModel):
@@ -23,3 +26,4 @@ class TelegramContent(BaseModel):
 class GenerateResponse(BaseModel):
     youtube: Optional[YouTubeContent] = None
     telegram: Optional[TelegramContent] = None
+    cached: bool = False
@@ -1,9 +1,40 @@
 from .generator import (
-    load_llm,
-    bulk_generate_content
+    bulk_generate_content,
+    prepare_transcript,
+    fits_context,
+    content_budget,
+    count_tokens,
+    truncate_tokens,
+    split_for_summary,
+    summarize_chunk,
+    clean_field,
+    json_parse_stats,
+    PLATFORM_MODELS
 )
+from .scheduler import QueueFullError, GenerationCancelled
+from .model_manager import model_manager, UnknownTierError
+from .streaming import JsonFieldParser
+from .result_cache import result_cache, make_key
+from .draft_model import speculative_stats
 
 __all__ = [
-    "load_llm",
-    "bulk_generate_content"
+    "bulk_generate_content",
+    "prepare_transcript",
+    "fits_context",
+    "content_budget",
+    "count_tokens",
+    "truncate_tokens",
+    "split_for_summary",
+    "summarize_chunk",
+    "clean_field",
+    "json_parse_stats",
+    "PLATFORM_MODELS",
+    "model_manager",
+    "UnknownTierError",
+    "QueueFullError",
+    "GenerationCancelled",
+    "JsonFieldParser",
+    "result_cache",
+    "make_key",
+    "speculative_stats"
 ]
@@ -0,0 +1,94 @@
+import logging
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+import numpy.typing as npt
+from llama_cpp import Llama
+from llama_cpp.llama_speculative import LlamaDraftModel
+
+logger = logging.getLogger(__name__)
+
+
+class SmallModelDraft(LlamaDraftModel):
+    """
+    Черновая модель для спекулятивного декодирования: маленькая GGUF модель
+    с тем же словарем (например, Qwen2.5-0.5B для Qwen2-7B) жадно предлагает
+    несколько следующих токенов, основная модель проверяет их за один проход.
+
+    Доля принятых токенов считается по следующему вызову: контекст основной модели
+    начинается с принятой части прошлого черновика.
+    """
+
+    def __init__(self, model_path: str, num_pred_tokens: int = 8, n_ctx: int = 4096, n_threads: int = None, n_gpu_layers: int = 0):
+        """
+        Args:
+            model_path: путь к GGUF черновой модели
+            num_pred_tokens: сколько токенов предлагать за шаг
+        """
+        self.num_pred_tokens = num_pred_tokens
+        self.model = Llama(
+            model_path=model_path,
+            n_ctx=n_ctx,
+            n_threads=n_threads,
+            n_gpu_layers=n_gpu_layers,
+            use_mmap=True,
+            verbose=False
+        )
+        self._lock = threading.Lock()
+        self._last_context: List[int] = []
+        self._last_draft: List[int] = []
+        self._proposed = 0
+        self._accepted = 0
+
+    def __call__(self, input_ids: npt.NDArray[np.intc], /, **kwargs) -> npt.NDArray[np.intc]:
+        context = input_ids.tolist()
+        self._account(context)
+
+        draft = []
+        # generate сам переиспользует KV общего с прошлым вызовом префикса
+        for token in self.model.generate(context, top_k=1, temp=0.0, reset=True):
+            if token == self.model.token_eos():
+                break
+            draft.append(token)
+            if len(draft) >= self.num_pred_tokens:
+                break
+
+        with self._lock:
+            self._last_context = context
+            self._last_draft = draft
+        return np.array(draft, dtype=np.intc)
+
+    def _account(self, context: List[int]):
+        """Сколько токенов прошлого черновика основная модель приняла"""
+        with self._lock:
+            prev = len(self._last_context)
+            # новый запрос, а не продолжение прошлого: черновик не проверялся
+            if not self._last_draft or len(context) <= prev or context[max(0, prev - 16):prev] != self._last_context[-16:]:
+                self._last_draft = []
+                return
+            accepted = 0
+            for proposed, actual in zip(self._last_draft, context[prev:]):
+                if proposed != actual:
+                    break
+                accepted += 1
+            self._proposed += len(self._last_draft)
+            self._accepted += accepted
+            self._last_draft = []
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"proposed": self._proposed, "accepted": self._accepted}
+
+
+def speculative_stats(drafts: List[Optional[SmallModelDraft]]) -> Optional[Dict]:
+    """Суммарная доля принятых черновых токенов по слотам; None, если черновая модель не используется"""
+    drafts = [d for d in drafts if isinstance(d, SmallModelDraft)]
+    if not drafts:
+        return None
+    proposed = sum(d.stats()["proposed"] for d in drafts)
+    accepted = sum(d.stats()["accepted"] for d in drafts)
+    return {
+        "draft_tokens_proposed": proposed,
+        "draft_tokens_accepted": accepted,
+        "acceptance_rate": round(accepted / proposed, 4) if proposed else 0.0
+    }
@@ -1,13 +1,23 @@
 import logging
 import json
 import re
-from llama_cpp import Llama
-from typing import List, Dict, Any
+import threading
+from collections import Counter
+from functools import lru_cache
+from llama_cpp import Llama, LlamaGrammar, LlamaRAMCache, LlamaDiskCache
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from models import YouTubeContent, TelegramContent
+from services.scheduler import GenerationCancelled
+from services.draft_model import SmallModelDraft
+from services.llama_server import LlamaServerModel
 import config
 
 logger = logging.getLogger(__name__)
 
-llm = None
+# исходы разбора JSON ответа модели: valid — сразу корректный, fixed — после
+# _fix_json_encoding, repaired — после _repair_json, failed — контент не получен
+_json_outcomes = Counter()
+_json_outcomes_lock = threading.Lock()
 
 
 # форматы постов и их промты
@@ -22,44 +32,238 @@ POST_FORMAT_INSTRUCTIONS = {
     "storytelling": "Используй повествовательный стиль, расскажи историю.",
 }
 
+SYSTEM_PROMPT = "Ты — помощник по созданию контента. Пиши только на русском языке. Твоя задача — переписать или кратко изложить предоставленный текст в нужном формате. Не пиши вводных фраз, отвечай сразу готовым текстом."
+JSON_MODE_SUFFIX = " ОТВЕЧАЙ СТРОГО В ФОРМАТЕ JSON."
 
-def load_llm():
-    """Загрузка GGUF модели при старте сервиса"""
-    global llm
-    logger.info(f"Загрузка модели из {config.MODEL_PATH}...")
-    llm = Llama(
-        model_path=config.MODEL_PATH,
+# неизменная часть промта генерации: одинакова для всех запросов, поэтому
+# ее состояние (KV) переиспользуется из кэша промтов
+CONTENT_PROMPT_PREFIX = """
+ЗАДАНИЕ: Сгенерируй контент по тексту видео, приведенному ниже, для платформ из списка после него.
+
+ОТВЕТЬ СТРОГО В ФОРМАТЕ JSON:
+{
+  "youtube": {
+    "title": "...",
+    "description": "...",
+    "tags": ["tag1", "tag2", ...]
+  },
+  "telegram": {
+    "title": "...",
+    "post": "..."
+  }
+}
+
+ПРАВИЛА:
+1. Пиши только на русском языке.
+2. Никаких вводных фраз ("Вот ваш контент", "Конечно").
+3. В полях YouTube description и Telegram post используй символы переноса строки \\n (НЕ реальные переносы строк).
+4. ВСЕ кавычки внутри текста должны быть экранированы как \\".
+5. Поля для невыбранных платформ оставь null.
+6. ВАЖНО: убедись, что весь JSON корректен и все строки закрыты.
+"""
+
+# промт map-reduce суммаризации части длинного транскрипта (неизменная часть — первой)
+SUMMARY_PROMPT_PREFIX = """
+ЗАДАНИЕ: Кратко изложи на русском языке часть транскрипта видео, приведенную ниже.
+Сохрани ключевые факты, имена, цифры и выводы. Пиши связным текстом, без списков и вводных фраз.
+"""
+
+# запас токенов на разметку chat template (роли, служебные токены)
+CHAT_TEMPLATE_TOKENS = 32
+
+# схемы ответа по платформам: из них строится грамматика для ограниченного декодирования
+PLATFORM_MODELS = {
+    "youtube": YouTubeContent,
+    "telegram": TelegramContent,
+}
+
+# лимиты длины полей после очистки
+FIELD_LIMITS = {
+    ("youtube", "title"): 100,
+    ("youtube", "description"): 1000,
+    ("telegram", "title"): 200,
+    ("telegram", "post"): 3500,
+}
+
+# названия языков транскрипта для промта
+LANGUAGE_NAMES = {
+    "ru": "русский",
+    "en": "английский",
+    "uk": "украинский",
+    "be": "белорусский",
+    "kk": "казахский",
+    "de": "немецкий",
+    "fr": "французский",
+    "es": "испанский",
+    "it": "итальянский",
+    "pt": "португальский",
+    "tr": "турецкий",
+    "zh": "китайский",
+    "ja": "японский",
+    "ko": "корейский",
+}
+
+
+def create_llm(model_path: str, n_threads: Optional[int] = None) -> Llama:
+    """
+    Контекст llama.cpp для одного слота, с кэшем промтов и черновой моделью
+    Args:
+        n_threads: потоков на контекст (по умолчанию N_THREADS)
+    """
+    n_threads = n_threads or config.N_THREADS
+    draft_model = None
+    if config.DRAFT_MODEL_PATH:
+        draft_model = SmallModelDraft(
+            config.DRAFT_MODEL_PATH,
+            num_pred_tokens=config.DRAFT_NUM_PRED_TOKENS,
+            n_ctx=config.N_CTX,
+            n_threads=n_threads,
+            n_gpu_layers=config.N_GPU_LAYERS
+        )
+    
+    # веса отображаются из файла (mmap): слоты и процессы на одном хосте
+    # читают одну копию из page cache, в памяти процесса остаются только KV кэш и буферы
+    model = Llama(
+        model_path=model_path,
         n_ctx=config.N_CTX,
-        n_threads=config.N_THREADS,
+        n_threads=n_threads,
         n_gpu_layers=config.N_GPU_LAYERS,
-        n_batch=128,
+        n_batch=config.N_BATCH,
+        use_mmap=True,
+        use_mlock=config.MODEL_MLOCK,
+        draft_model=draft_model,
         verbose=False 
     )
-    logger.info("Модель успешно загружена")
+    
+    if config.PROMPT_CACHE == "ram":
+        model.set_cache(LlamaRAMCache(capacity_bytes=config.PROMPT_CACHE_MB << 20))
+    elif config.PROMPT_CACHE == "disk":
+        model.set_cache(LlamaDiskCache(cache_dir=config.PROMPT_CACHE_DIR, capacity_bytes=config.PROMPT_CACHE_MB << 20))
+    return model
+
+
+def warm_prompt_cache(models: List[Llama]):
+    """
+    Прогрев кэша промтов: генерация одного токена по промту без транскрипта в каждом слоте.
+    Состояние с общим префиксом (system prompt + неизменная часть задания) попадает
+    в кэш, первый реальный запрос вычисляет только свой хвост.
+    """
+    models = [model for model in models if model.cache is not None]
+    if not models:
+        return
+    logger.info("Прогрев кэша промтов...")
+    for model in models:
+        model.create_chat_completion(
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT + JSON_MODE_SUFFIX},
+                {"role": "user", "content": CONTENT_PROMPT_PREFIX}
+            ],
+            max_tokens=1,
+            temperature=config.TEMPERATURE
+        )
+    logger.info("Кэш промтов прогрет")
 
 
-def ask_llm(prompt: str, json_mode: bool = False) -> str:
-    """Генерация текста через LLM"""
-    system_prompt = "Ты — помощник по созданию контента. Пиши только на русском языке. Твоя задача — переписать или кратко изложить предоставленный текст в нужном формате. Не пиши вводных фраз, отвечай сразу готовым текстом."
+def response_schema(platforms: List[str]) -> Dict[str, Any]:
+    """JSON schema ответа: только выбранные платформы, все поля обязательны"""
+    selected = [p for p in PLATFORM_MODELS if p in platforms]
+    return {
+        "type": "object",
+        "properties": {
+            p: dict(PLATFORM_MODELS[p].model_json_schema(), additionalProperties=False)
+            for p in selected
+        },
+        "required": selected,
+        "additionalProperties": False
+    }
+
+
+@lru_cache(maxsize=8)
+def _response_grammar(platforms: tuple) -> LlamaGrammar:
+    """GBNF грамматика из схемы ответа, компилируется один раз на набор платформ"""
+    return LlamaGrammar.from_json_schema(json.dumps(response_schema(list(platforms))), verbose=False)
+
+
+def ask_llm(
+        prompt: str,
+        json_mode: bool = False,
+        platforms: Optional[List[str]] = None,
+        model: Optional[Llama] = None,
+        cancel: Optional[threading.Event] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        max_tokens: Optional[int] = None
+) -> str:
+    """
+    Генерация текста через LLM.
+    В json_mode с platforms декодирование ограничено грамматикой схемы ответа:
+    модель может выдать только корректный JSON с полями выбранных платформ.
+    
+    Args:
+        model: контекст слота
+        cancel: событие отмены, проверяется после каждого токена
+        on_token: вызывается с каждым фрагментом текста по мере генерации
+        max_tokens: лимит ответа (по умолчанию MAX_TOKENS, в json_mode — вдвое больше)
+    Raises:
+        GenerationCancelled: если генерация отменена
+    """
+    system_prompt = SYSTEM_PROMPT
     if json_mode:
-        system_prompt += " ОТВЕЧАЙ СТРОГО В ФОРМАТЕ JSON."
+        system_prompt += JSON_MODE_SUFFIX
 
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt}
     ]
     
-    max_tokens = config.MAX_TOKENS * 2 if json_mode else config.MAX_TOKENS
+    if max_tokens is None:
+        max_tokens = config.MAX_TOKENS * 2 if json_mode else config.MAX_TOKENS
+    
+    grammar = None
+    response_format = None
+    selected = tuple(p for p in PLATFORM_MODELS if p in (platforms or []))
+    if json_mode and selected and config.GRAMMAR_ENABLED:
+        if isinstance(model, LlamaServerModel):
+            # llama.cpp server строит грамматику из схемы сам
+            response_format = {"type": "json_object", "schema": response_schema(list(selected))}
+        else:
+            grammar = _response_grammar(selected)
+    elif json_mode:
+        response_format = {"type": "json_object"}
     
-    output = llm.create_chat_completion(
+    # потоковый режим нужен, чтобы прервать генерацию между токенами
+    stream = model.create_chat_completion(
         messages=messages,
         max_tokens=max_tokens,
         temperature=config.TEMPERATURE,
         top_p=config.TOP_P,
-        response_format={"type": "json_object"} if json_mode else None
+        response_format=response_format,
+        grammar=grammar,
+        stream=True
     )
     
-    return output["choices"][0]["message"]["content"]
+    parts = []
+    for chunk in stream:
+        if cancel is not None and cancel.is_set():
+            stream.close()
+            raise GenerationCancelled("Генерация отменена")
+        text = chunk["choices"][0]["delta"].get("content") or ""
+        if text:
+            parts.append(text)
+            if on_token is not None:
+                on_token(text)
+    
+    return "".join(parts)
+
+
+def _count_json_outcome(outcome: str):
+    with _json_outcomes_lock:
+        _json_outcomes[outcome] += 1
+
+
+def json_parse_stats() -> Dict[str, int]:
+    """Счетчики исходов разбора JSON ответа с момента запуска"""
+    with _json_outcomes_lock:
+        return {outcome: _json_outcomes[outcome] for outcome in ("valid", "fixed", "repaired", "failed")}
 
 
 def _fix_json_encoding(json_str: str) -> str:
@@ -184,11 +388,27 @@ def clean_text(text: str, max_chars: int = 4000) -> str:
     return result[:max_chars]
 
 
-def bulk_generate_content(transcript: str, platforms: List[str], post_format: str = "neutral", custom_prompt: str = None) -> Dict[str, Any]:
-    """Генерация всего контента за один запрос к LLM"""
-    
-    instruction = custom_prompt if custom_prompt else POST_FORMAT_INSTRUCTIONS.get(post_format, "")
-    
+def clean_field(platform: str, field: str, value: Any) -> Any:
+    """Очистка поля сгенерированного контента: лимит длины для текста, # для тегов"""
+    if field == "tags":
+        tags = value
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(",")]
+        return [t if t.startswith("#") else f"#{t}" for t in tags[:10]]
+    limit = FIELD_LIMITS.get((platform, field))
+    return clean_text(value, limit) if limit else value
+
+
+def _language_note(language: str) -> str:
+    """Пояснение для промта, если транскрипт не на русском языке"""
+    if not language or language == "ru":
+        return ""
+    name = LANGUAGE_NAMES.get(language, language)
+    return f"Исходный текст на языке: {name}. Передай его смысл, но итоговый контент пиши на русском языке.\n"
+
+
+def _content_prompt(transcript: str, platforms: List[str], instruction: str, language: str = None) -> str:
+    """Промт генерации контента"""
     platform_requests = []
     if "youtube" in platforms:
         platform_requests.append("- YouTube: заголовок (до 60 симв), описание (до 300 симв), 7 тегов через запятую")
@@ -197,67 +417,244 @@ def bulk_generate_content(transcript: str, platforms: List[str], post_format: st
 
     requests_text = "\n".join(platform_requests)
 
-    prompt = f"""
+    # неизменная часть промта идет первой, за ней транскрипт, а платформы и инструкция —
+    # в конце: запросы по разным платформам с одним транскриптом делят префикс
+    # в кэше промтов, и транскрипт вычисляется один раз, а не для каждой платформы
+    return f"""{CONTENT_PROMPT_PREFIX}
 Текст видео для обработки:
 {transcript}
 
-Стиль/Инструкция: {instruction}
-
-ЗАДАНИЕ: Сгенерируй контент для следующих платформ:
+Платформы:
 {requests_text}
 
-ОТВЕТЬ СТРОГО В ФОРМАТЕ JSON:
-{{
-  "youtube": {{
-    "title": "...",
-    "description": "...",
-    "tags": ["tag1", "tag2", ...]
-  }},
-  "telegram": {{
-    "title": "...",
-    "post": "..."
-  }}
-}}
-
-ПРАВИЛА:
-1. Пиши только на русском языке.
-2. Никаких вводных фраз ("Вот ваш контент", "Конечно").
-3. В полях YouTube description и Telegram post используй символы переноса строки \\n (НЕ реальные переносы строк).
-4. ВСЕ кавычки внутри текста должны быть экранированы как \\".
-5. Поля для невыбранных платформ оставь null.
-6. ВАЖНО: убедись, что весь JSON корректен и все строки закрыты.
+{_language_note(language)}Стиль/Инструкция: {instruction}
 """
 
+
+def _count_tokens(model: Llama, text: str) -> int:
+    """Количество токенов текста по токенизатору модели"""
+    return len(model.tokenize(text.encode("utf-8"), add_bos=False))
+
+
+def _transcript_budget(model: Llama, prompt_without_text: str, reserve: int = None) -> int:
+    """
+    Сколько токенов текста помещается в контекст вместе с промтом и ответом
+    Args:
+        prompt_without_text: промт без транскрипта
+        reserve: токены на ответ (по умолчанию GENERATION_RESERVE_TOKENS)
+    """
+    if reserve is None:
+        reserve = config.GENERATION_RESERVE_TOKENS
+    overhead = _count_tokens(model, SYSTEM_PROMPT + JSON_MODE_SUFFIX + prompt_without_text) + CHAT_TEMPLATE_TOKENS
+    return max(1, model.n_ctx() - overhead - reserve)
+
+
+def _split_by_tokens(model: Llama, text: str, max_tokens: int) -> List[str]:
+    """
+    Делит текст на части не длиннее max_tokens токенов по границам предложений.
+    Предложение длиннее лимита режется по токенам.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for sentence in re.split(r'(?<=[.!?…])\s+', text.strip()):
+        if not sentence:
+            continue
+        tokens = model.tokenize(sentence.encode("utf-8"), add_bos=False)
+        if len(tokens) > max_tokens:
+            pieces = [
+                model.detokenize(tokens[i:i + max_tokens]).decode("utf-8", errors="ignore")
+                for i in range(0, len(tokens), max_tokens)
+            ]
+        else:
+            pieces = [sentence]
+        
+        for piece in pieces:
+            piece_tokens = len(tokens) if len(pieces) == 1 else _count_tokens(model, piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def count_tokens(text: str, model: Optional[Llama] = None) -> int:
+    """Количество токенов текста; только токенизация, можно вызывать вне слота"""
+    return _count_tokens(model, text)
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[Llama] = None) -> str:
+    """Начало текста не длиннее max_tokens токенов (по границам предложений)"""
+    return _split_by_tokens(model, text, max_tokens)[0]
+
+
+def content_budget(
+        platforms: List[str],
+        post_format: str = "neutral",
+        custom_prompt: str = None,
+        language: str = None,
+        model: Optional[Llama] = None
+) -> int:
+    """Сколько токенов транскрипта помещается в промт генерации контента"""
+    instruction = custom_prompt if custom_prompt else POST_FORMAT_INSTRUCTIONS.get(post_format, "")
+    return _transcript_budget(model, _content_prompt("", platforms, instruction, language))
+
+
+def split_for_summary(text: str, model: Optional[Llama] = None) -> List[str]:
+    """
+    Map шаг: части текста, каждая из которых помещается в промт суммаризации.
+    Только токенизация, поэтому можно вызывать вне слота.
+    """
+    chunk_budget = _transcript_budget(model, SUMMARY_PROMPT_PREFIX, reserve=config.SUMMARY_MAX_TOKENS)
+    chunks = _split_by_tokens(model, text, chunk_budget)
+    logger.info(f"Map-reduce: {_count_tokens(model, text)} токенов -> {len(chunks)} частей по <= {chunk_budget}")
+    return chunks
+
+
+def summarize_chunk(
+        chunk: str,
+        index: int,
+        total: int,
+        model: Optional[Llama] = None,
+        cancel: Optional[threading.Event] = None
+) -> str:
+    """Краткое изложение одной части текста; выполняется в слоте планировщика"""
+    prompt = f"{SUMMARY_PROMPT_PREFIX}\nЧасть {index} из {total}:\n{chunk}\n"
+    return clean_text(
+        ask_llm(prompt, model=model, cancel=cancel, max_tokens=config.SUMMARY_MAX_TOKENS),
+        max_chars=len(chunk)
+    )
+
+
+def summarize_long_text(
+        text: str,
+        budget: int,
+        model: Optional[Llama] = None,
+        cancel: Optional[threading.Event] = None,
+        depth: int = 0
+) -> str:
+    """
+    Map-reduce суммаризация в одном слоте: текст делится на части по бюджету токенов,
+    каждая часть кратко излагается, изложения склеиваются. Если результат
+    все еще не помещается в budget, шаг повторяется (не глубже MAP_REDUCE_MAX_DEPTH).
+    Сервис распределяет части по слотам сам (condense_transcript в main).
+    
+    Args:
+        text: исходный текст
+        budget: сколько токенов текста должно остаться для итогового промта
+    Returns:
+        изложение не длиннее budget токенов (или обрезанное на последнем уровне)
+    """
+    chunks = split_for_summary(text, model=model)
+    summaries = [
+        summarize_chunk(chunk, i, len(chunks), model=model, cancel=cancel)
+        for i, chunk in enumerate(chunks, start=1)
+    ]
+    merged = "\n\n".join(s for s in summaries if s)
+    
+    if _count_tokens(model, merged) <= budget:
+        return merged
+    if depth + 1 >= config.MAP_REDUCE_MAX_DEPTH or len(chunks) == 1:
+        logger.warning("Изложение не поместилось в контекст, обрезается")
+        return truncate_tokens(merged, budget, model=model)
+    return summarize_long_text(merged, budget, model=model, cancel=cancel, depth=depth + 1)
+
+
+def fits_context(
+        transcript: str,
+        platforms: List[str],
+        post_format: str = "neutral",
+        custom_prompt: str = None,
+        language: str = None,
+        model: Optional[Llama] = None
+) -> bool:
+    """
+    Помещается ли транскрипт в контекст вместе с промтом (или сжатие выключено).
+    Только токенизация, поэтому можно вызывать вне слота.
+    """
+    if not config.MAP_REDUCE_ENABLED:
+        return True
+    budget = content_budget(platforms, post_format, custom_prompt, language, model=model)
+    return _count_tokens(model, transcript) <= budget
+
+
+def prepare_transcript(
+        transcript: str,
+        platforms: List[str],
+        post_format: str = "neutral",
+        custom_prompt: str = None,
+        language: str = None,
+        model: Optional[Llama] = None,
+        cancel: Optional[threading.Event] = None
+) -> Tuple[str, Optional[str]]:
+    """
+    Транскрипт, не помещающийся в контекст вместе с промтом, сжимается
+    map-reduce суммаризацией (изложение на русском, поэтому язык сбрасывается).
+    
+    Returns:
+        (текст для промта, язык текста)
+    """
+    if fits_context(transcript, platforms, post_format, custom_prompt, language, model=model):
+        return transcript, language
+    budget = content_budget(platforms, post_format, custom_prompt, language, model=model)
+    return summarize_long_text(transcript, budget, model=model, cancel=cancel), None
+
+
+def bulk_generate_content(
+        transcript: str,
+        platforms: List[str],
+        post_format: str = "neutral",
+        custom_prompt: str = None,
+        language: str = None,
+        model: Optional[Llama] = None,
+        cancel: Optional[threading.Event] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        max_tokens: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Генерация всего контента за один запрос к LLM.
+    Выполняется в слоте планировщика (model и cancel передает слот),
+    on_token получает фрагменты ответа для потоковой отдачи.
+    max_tokens — лимит ответа (при генерации одной платформы — ее бюджет).
+    """
+    
+    instruction = custom_prompt if custom_prompt else POST_FORMAT_INSTRUCTIONS.get(post_format, "")
+
     try:
-        raw_response = ask_llm(prompt, json_mode=True)
+        transcript, language = prepare_transcript(transcript, platforms, post_format, custom_prompt, language, model=model, cancel=cancel)
+        prompt = _content_prompt(transcript, platforms, instruction, language)
+        raw_response = ask_llm(prompt, json_mode=True, platforms=platforms, model=model, cancel=cancel, on_token=on_token, max_tokens=max_tokens)
         logger.debug(f"Raw LLM response: {raw_response}")
         clean_json = re.sub(r'```json\s*|\s*```', '', raw_response).strip()
         
         try:
-        data = json.loads(clean_json)
+            data = json.loads(clean_json)
+            _count_json_outcome("valid")
         except json.JSONDecodeError as json_err:
+            # с грамматикой сюда попадаем только при обрыве по max_tokens
+            logger.warning(f"Некорректный JSON от модели, попытка восстановления: {json_err}")
             fixed_json = _fix_json_encoding(clean_json)
             try:
                 data = json.loads(fixed_json)
+                _count_json_outcome("fixed")
             except json.JSONDecodeError as fixed_err:
                 data = _repair_json(clean_json, fixed_err)
                 if not data:
+                    _count_json_outcome("failed")
                     return {"youtube": None, "telegram": None}
+                _count_json_outcome("repaired")
         
-        if data.get("youtube"):
-            data["youtube"]["title"] = clean_text(data["youtube"].get("title", ""), 100)
-            data["youtube"]["description"] = clean_text(data["youtube"].get("description", ""), 1000)
-            tags = data["youtube"].get("tags", [])
-            if isinstance(tags, str):
-                tags = [t.strip() for t in tags.split(",")]
-            data["youtube"]["tags"] = [t if t.startswith("#") else f"#{t}" for t in tags[:10]]
-
-        if data.get("telegram"):
-            data["telegram"]["title"] = clean_text(data["telegram"].get("title", ""), 200)
-            data["telegram"]["post"] = clean_text(data["telegram"].get("post", ""), 3500)
+        for platform, content_model in PLATFORM_MODELS.items():
+            if data.get(platform):
+                for field in content_model.model_fields:
+                    data[platform][field] = clean_field(platform, field, data[platform].get(field, [] if field == "tags" else ""))
             
         logger.info("Контент успешно сгенерирован")
         return data
+    except GenerationCancelled:
+        raise
     except Exception as e:
         logger.error(f"Ошибка при массовой генерации: {e}", exc_info=True)
+        _count_json_outcome("failed")
         return {"youtube": None, "telegram": None}
\ No newline at end of file
@@ -0,0 +1,119 @@
+import json
+import time
+import logging
+from typing import Dict, Iterator, List, Optional
+import httpx
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class LlamaServerModel:
+    """
+    Слот генерации на llama.cpp server (llama-server --parallel N --cont-batching).
+    Сервер держит один KV кэш на N последовательностей и на каждом шаге декодирует
+    токены всех активных запросов одним батчем, поэтому пропускная способность растет
+    с числом одновременных запросов, а веса загружены один раз.
+
+    Повторяет ту часть интерфейса llama_cpp.Llama, которой пользуется генератор:
+    create_chat_completion (только поток), tokenize, detokenize, n_ctx.
+    Закрытие потока ответа закрывает соединение — сервер прекращает генерацию.
+    """
+
+    # кэш промтов на стороне сервера (cache_prompt), черновая модель — его параметр -md
+    cache = None
+    draft_model = None
+
+    def __init__(self, base_url: str, timeout: float = 600.0):
+        """
+        Args:
+            base_url: адрес llama-server, например http://llm_server:8080
+            timeout: таймаут чтения ответа в секундах
+        """
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(base_url=self.base_url, timeout=httpx.Timeout(timeout, connect=10.0))
+        self._n_ctx: Optional[int] = None
+
+    def wait_ready(self, timeout: float = 300.0):
+        """
+        Ждет, пока сервер загрузит модель (GET /health отвечает 200)
+        Raises:
+            RuntimeError: если сервер не готов за timeout секунд
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self._client.get("/health").status_code == 200:
+                    logger.info(f"llama.cpp server готов: {self.base_url}")
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"llama.cpp server {self.base_url} не готов за {timeout:.0f} сек")
+            time.sleep(1.0)
+
+    def create_chat_completion(
+            self,
+            messages: List[Dict],
+            max_tokens: int,
+            temperature: float,
+            top_p: float,
+            response_format: Optional[Dict] = None,
+            grammar=None,
+            stream: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Поток чанков в формате OpenAI, как у Llama.create_chat_completion(stream=True).
+        Ограничение вывода передается через response_format со схемой: грамматику
+        сервер строит сам, объект LlamaGrammar (grammar) не используется.
+        """
+        payload = {
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": True,
+            "cache_prompt": True  # общий префикс промта берется из KV кэша слота сервера
+        }
+        if response_format:
+            payload["response_format"] = response_format
+        return self._stream(payload)
+
+    def _stream(self, payload: Dict) -> Iterator[Dict]:
+        with self._client.stream("POST", "/v1/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                yield json.loads(data)
+
+    def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False) -> List[int]:
+        response = self._client.post("/tokenize", json={
+            "content": text.decode("utf-8", errors="ignore"),
+            "add_special": add_bos
+        })
+        response.raise_for_status()
+        return response.json()["tokens"]
+
+    def detokenize(self, tokens: List[int]) -> bytes:
+        response = self._client.post("/detokenize", json={"tokens": tokens})
+        response.raise_for_status()
+        return response.json()["content"].encode("utf-8")
+
+    def n_ctx(self) -> int:
+        """Контекст одного слота сервера (--ctx-size / --parallel)"""
+        if self._n_ctx is None:
+            try:
+                response = self._client.get("/props")
+                response.raise_for_status()
+                self._n_ctx = response.json()["default_generation_settings"]["n_ctx"]
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                logger.warning(f"Не удалось получить n_ctx сервера, используется N_CTX: {e}")
+                return config.N_CTX
+        return self._n_ctx
+
+    def close(self):
+        self._client.close()
@@ -0,0 +1,189 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+from llama_cpp import Llama
+from services.scheduler import GenerationScheduler
+from services.generator import create_llm, warm_prompt_cache
+from services.llama_server import LlamaServerModel
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownTierError(KeyError):
+    """Запрошен тир модели, которого нет в MODEL_TIERS"""
+    pass
+
+
+class ModelTier:
+    """Тир модели: файл GGUF и планировщик слотов, пока модель загружена"""
+
+    def __init__(self, name: str, model_path: str, pinned: bool = False):
+        self.name = name
+        self.model_path = model_path
+        self.pinned = pinned
+        self.scheduler: Optional[GenerationScheduler] = None
+        self.last_used = 0.0
+        self.load_seconds: Optional[float] = None
+        self.lock = threading.Lock()  # одна загрузка тира за раз
+
+
+class ModelManager:
+    """
+    Менеджер GGUF моделей по тирам (например, быстрая и качественная).
+    Модель тира загружается при первом запросе — по контексту на каждый слот
+    генерации — и выгружается после idle_ttl секунд без задач.
+    С LLM_BACKEND=server тир — адрес llama.cpp server, слоты — соединения с ним.
+    Веса отображаются из файла (mmap), поэтому несколько воркеров на одном хосте
+    делят одну копию в page cache, а повторная загрузка выгруженного тира идет из кэша ОС.
+    """
+
+    def __init__(self, tiers: Dict[str, str], default_tier: str, idle_ttl: float = 900.0, pinned: Optional[List[str]] = None):
+        """
+        Args:
+            tiers: тир -> путь к GGUF
+            default_tier: тир для запросов без model_tier
+            idle_ttl: через сколько секунд простоя выгружать модель (0 — никогда)
+            pinned: тиры, загружаемые при старте и не выгружаемые
+        """
+        pinned = pinned or []
+        unknown = [tier for tier in pinned if tier not in tiers]
+        if unknown:
+            logger.warning(f"PRELOAD_TIERS: неизвестные тиры {unknown} пропущены")
+        self.default_tier = default_tier
+        self.idle_ttl = idle_ttl
+        self._tiers = {name: ModelTier(name, path, pinned=name in pinned) for name, path in tiers.items()}
+        self._reaper: Optional[threading.Thread] = None
+
+    def start(self):
+        """Загружает закрепленные тиры и запускает выгрузку простаивающих"""
+        for tier in self._tiers.values():
+            if tier.pinned:
+                self.acquire(tier.name)
+        if self.idle_ttl > 0 and self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def resolve(self, tier: Optional[str]) -> ModelTier:
+        """
+        Raises:
+            UnknownTierError: если тира нет в конфигурации
+        """
+        name = tier or self.default_tier
+        if name not in self._tiers:
+            raise UnknownTierError(f"Неизвестный тир модели: {name}, доступны: {', '.join(self._tiers)}")
+        return self._tiers[name]
+
+    def model_path(self, tier: Optional[str]) -> str:
+        return self.resolve(tier).model_path
+
+    def acquire(self, tier: Optional[str]) -> GenerationScheduler:
+        """
+        Планировщик слотов тира; модель загружается, если еще не загружена.
+        Блокирует на время загрузки, из event loop вызывать через to_thread.
+        """
+        model_tier = self.resolve(tier)
+        with model_tier.lock:
+            model_tier.last_used = time.monotonic()
+            if model_tier.scheduler is None:
+                model_tier.scheduler = self._load(model_tier)
+            return model_tier.scheduler
+
+    def unload(self, tier: str, idle_for: Optional[float] = None) -> bool:
+        """
+        Выгружает модель тира, если у нее нет задач
+        Args:
+            idle_for: выгружать, только если тир не запрашивали столько секунд
+        Returns:
+            True, если модель выгружена
+        """
+        model_tier = self.resolve(tier)
+        with model_tier.lock:
+            if model_tier.scheduler is None:
+                return False
+            # проверка под блокировкой: acquire() мог выдать планировщик после решения о выгрузке
+            if idle_for is not None and time.monotonic() - model_tier.last_used <= idle_for:
+                return False
+            models = model_tier.scheduler.models
+            if not model_tier.scheduler.stop():
+                return False
+            model_tier.scheduler = None
+        for model in models:
+            model.close()
+        logger.info(f"Модель тира {model_tier.name} выгружена")
+        return True
+
+    def loaded_models(self) -> List[Llama]:
+        """Контексты всех загруженных тиров"""
+        return [model for tier in self._tiers.values() if tier.scheduler for model in tier.scheduler.models]
+
+    def queues(self) -> Dict[str, Optional[Dict]]:
+        """Состояние слотов и очереди по тирам (None — модель не загружена)"""
+        return {name: tier.scheduler.status() if tier.scheduler else None for name, tier in self._tiers.items()}
+
+    def status(self) -> Dict:
+        """Тиры, их файлы и состояние загрузки"""
+        now = time.monotonic()
+        tiers = []
+        for tier in self._tiers.values():
+            try:
+                file_size = os.path.getsize(tier.model_path)
+            except OSError:
+                file_size = None
+            tiers.append({
+                "tier": tier.name,
+                "model_path": tier.model_path,
+                "file_size": file_size,
+                "loaded": tier.scheduler is not None,
+                "pinned": tier.pinned,
+                "idle_seconds": round(now - tier.last_used, 1) if tier.last_used else None,
+                "load_seconds": tier.load_seconds
+            })
+        return {"default_tier": self.default_tier, "idle_ttl": self.idle_ttl, "tiers": tiers}
+
+    def _load(self, tier: ModelTier) -> GenerationScheduler:
+        logger.info(f"Загрузка модели тира {tier.name} из {tier.model_path}, слотов: {config.LLM_SLOTS}...")
+        started = time.monotonic()
+        if config.LLM_BACKEND == "server":
+            models = [LlamaServerModel(tier.model_path, config.LLM_SERVER_TIMEOUT) for _ in range(config.LLM_SLOTS)]
+            models[0].wait_ready(config.LLM_SERVER_STARTUP_TIMEOUT)
+        else:
+            # потоки делятся между слотами, чтобы слоты не конкурировали за ядра
+            n_threads = max(1, config.N_THREADS // config.LLM_SLOTS)
+            models = [create_llm(tier.model_path, n_threads=n_threads) for _ in range(config.LLM_SLOTS)]
+        if config.PROMPT_CACHE_WARMUP:
+            warm_prompt_cache(models)
+        tier.load_seconds = round(time.monotonic() - started, 1)
+
+        scheduler = GenerationScheduler(config.GENERATION_QUEUE_SIZE)
+        scheduler.start(models, name=tier.name)
+        logger.info(f"Модель тира {tier.name} загружена за {tier.load_seconds} сек")
+        if config.DRAFT_MODEL_PATH:
+            logger.info(f"Спекулятивное декодирование: черновая модель {config.DRAFT_MODEL_PATH}, {config.DRAFT_NUM_PRED_TOKENS} токенов за шаг")
+        if models[0].cache is not None:
+            logger.info(f"Кэш промтов: {config.PROMPT_CACHE}, {config.PROMPT_CACHE_MB} МБ на слот")
+        return scheduler
+
+    def _reap(self):
+        """Фоновая выгрузка тиров, простаивающих дольше idle_ttl"""
+        while True:
+            time.sleep(min(60.0, self.idle_ttl / 2))
+            now = time.monotonic()
+            for tier in self._tiers.values():
+                scheduler = tier.scheduler
+                if tier.pinned or scheduler is None:
+                    continue
+                if not scheduler.idle():
+                    tier.last_used = now  # задачи еще идут — отсчет простоя с их окончания
+                elif now - tier.last_used > self.idle_ttl:
+                    self.unload(tier.name, idle_for=self.idle_ttl)
+
+
+model_manager = ModelManager(
+    config.MODEL_TIER_PATHS,
+    config.DEFAULT_MODEL_TIER,
+    config.MODEL_IDLE_TTL,
+    config.PRELOAD_TIERS
+)
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import config
+
+logger = logging.getLogger(__name__)
+
+# диск подрезается раз в столько записей: между проверками записей может быть
+# на столько больше max_entries
+DISK_TRIM_EVERY = 50
+
+
+def model_identity(model_path: str) -> str:
+    """Идентичность файла модели: путь, размер и время изменения (замена GGUF сбрасывает кэш)"""
+    try:
+        stat = os.stat(model_path)
+        return f"{model_path}|{stat.st_size}|{stat.st_mtime_ns}"
+    except OSError:
+        return model_path
+
+
+def make_key(
+        transcript: str,
+        post_format: str,
+        custom_prompt: Optional[str],
+        platforms: List[str],
+        language: Optional[str],
+        model_path: str
+) -> str:
+    """Ключ кэша: хэш всего, от чего зависит результат генерации"""
+    digest = hashlib.sha256()
+    for part in (
+        model_identity(model_path),
+        post_format,
+        custom_prompt or "",
+        ",".join(sorted(set(platforms))),
+        language or "",
+        transcript
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Кэш готовых ответов генерации: LRU в памяти с TTL и необязательный слой на диске.
+    При TEMPERATURE близкой к нулю повторная генерация дает почти тот же результат,
+    поэтому повтор сценария не требует нового прогона LLM.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 7 * 24 * 3600, cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_entries: Максимальное количество записей (в памяти и на диске)
+            ttl: Время жизни записи в секундах
+            cache_dir: Директория дискового слоя; None — только память
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_writes = 0
+
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            logger.info(f"Кэш генерации на диске: {self.cache_dir}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Сохраненный ответ или None (нет записи или истек TTL)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.cache_dir:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._remember(key, *entry)
+
+        if entry is not None and time.time() - entry[0] > self.ttl:
+            self._drop(key)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        return entry[1]
+
+    def put(self, key: str, result: Dict):
+        """Сохраняет ответ"""
+        stored_at = time.time()
+        self._remember(key, stored_at, result)
+
+        if self.cache_dir:
+            self._disk_put(key, stored_at, result)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "persistent": bool(self.cache_dir)
+            }
+
+    def _remember(self, key: str, stored_at: float, result: Dict):
+        with self._lock:
+            self._entries[key] = (stored_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.cache_dir:
+            self._disk_unlink(self.cache_dir / f"{key}.json")
+
+    def _disk_put(self, key: str, stored_at: float, result: Dict):
+        """Запись на диск; ошибка диска (нет места, только чтение) не ломает ответ"""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "result": result}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить запись кэша {path.name}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        # директория просматривается не на каждой записи: раз в DISK_TRIM_EVERY записей
+        with self._lock:
+            self._disk_writes += 1
+            trim = self._disk_writes % DISK_TRIM_EVERY == 0
+        if trim:
+            self._trim_disk()
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)
+            return data["stored_at"], data["result"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Поврежденная запись кэша {path.name}: {e}")
+            self._disk_unlink(path)
+            return None
+
+    @staticmethod
+    def _disk_unlink(path: Path):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Не удалось удалить запись кэша {path.name}: {e}")
+
+    def _trim_disk(self):
+        """Вытесняет с диска самые давно использованные записи (по mtime)"""
+        try:
+            files = list(self.cache_dir.glob("*.json"))
+            if len(files) <= self.max_entries:
+                return
+            files.sort(key=lambda p: p.stat().st_mtime)
+            for path in files[:len(files) - self.max_entries]:
+                path.unlink(missing_ok=True)
+        except OSError as e:
+            # файл удален параллельно или диск недоступен — подрежем при следующей проверке
+            logger.warning(f"Не удалось подрезать кэш на диске: {e}")
+
+
+result_cache = ResultCache(
+    config.RESULT_CACHE_SIZE,
+    config.RESULT_CACHE_TTL,
+    config.RESULT_CACHE_DIR
+) if config.RESULT_CACHE_ENABLED else None
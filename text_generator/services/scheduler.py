@@ -0,0 +1,181 @@
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+from llama_cpp import Llama
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Очередь генерации заполнена"""
+    pass
+
+
+class GenerationCancelled(Exception):
+    """Генерация отменена (клиент отключился)"""
+    pass
+
+
+class GenerationJob:
+    """
+    Задача на генерацию: функция с аргументами, Future для результата
+    и событие отмены, которое проверяется между токенами
+    """
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, label: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.label = label
+        self.future: Future = Future()
+        self.cancel_event = threading.Event()
+
+
+class GenerationScheduler:
+    """
+    Очередь допуска к генерации на нескольких слотах с отменой задач.
+    Слот — поток с моделью: соединение с llama.cpp server (сервер батчит
+    запросы всех слотов) или локальный контекст llama.cpp (без батчинга).
+    Задачи из общей очереди разбираются свободными слотами, лишние получают
+    503, а event loop не блокируется.
+    """
+
+    def __init__(self, max_queue: int = 16):
+        """
+        Args:
+            max_queue: Максимальное количество ожидающих задач
+        """
+        self.max_queue = max_queue
+        self.models: List[Llama] = []
+        self._pending: "deque[GenerationJob]" = deque()
+        self._running: Dict[int, GenerationJob] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._avg_duration = 30.0  # сек, скользящее среднее длительности задачи
+
+    def start(self, models: List[Llama], name: str = "generation"):
+        """Запускает по потоку на каждый слот"""
+        self.models = models
+        for slot, model in enumerate(models):
+            thread = threading.Thread(target=self._worker, args=(slot, model), name=f"{name}-slot-{slot}", daemon=True)
+            thread.start()
+        logger.info(f"Планировщик {name} запущен, слотов: {len(models)}")
+
+    def stop(self) -> bool:
+        """
+        Останавливает потоки слотов, если нет ни выполняемых, ни ожидающих задач
+        Returns:
+            True, если планировщик остановлен
+        """
+        with self._cond:
+            if self._pending or self._running:
+                return False
+            self._stopped = True
+            self._cond.notify_all()
+        self.models = []
+        return True
+
+    def idle(self) -> bool:
+        """Нет выполняемых и ожидающих задач"""
+        with self._cond:
+            return not self._pending and not self._running
+
+    def free_slots(self) -> int:
+        """Сколько слотов свободно с учетом ожидающих задач"""
+        with self._cond:
+            return max(0, len(self.models) - len(self._running) - len(self._pending))
+
+    def submit(self, fn: Callable, *args, label: str = "", **kwargs) -> GenerationJob:
+        """
+        Ставит задачу в очередь. Слот вызывает fn(*args, model=<Llama>, cancel=<Event>, **kwargs)
+        Raises:
+            QueueFullError: если в очереди уже max_queue задач
+        """
+        job = GenerationJob(fn, args, kwargs, label)
+        with self._cond:
+            if self._stopped:
+                raise QueueFullError("Модель выгружена, повторите запрос")
+            if len(self._pending) >= self.max_queue:
+                raise QueueFullError(f"Очередь генерации заполнена ({self.max_queue} задач)")
+            self._pending.append(job)
+            self._cond.notify()
+        return job
+
+    def cancel(self, job: GenerationJob) -> bool:
+        """
+        Отменяет задачу: снимает с очереди или прерывает генерацию на следующем токене
+        Returns:
+            True, если задача снята с очереди до запуска
+        """
+        job.cancel_event.set()
+        with self._cond:
+            try:
+                self._pending.remove(job)
+            except ValueError:
+                return False
+        job.future.cancel()
+        return True
+
+    def position(self, job: GenerationJob) -> Optional[int]:
+        """Позиция задачи: 0 — выполняется, 1..N — в очереди, None — завершена"""
+        with self._cond:
+            if job in self._running.values():
+                return 0
+            for i, pending in enumerate(self._pending, start=1):
+                if pending is job:
+                    return i
+        return None
+
+    def retry_after(self) -> int:
+        """Оценка в секундах, через сколько в очереди освободится место"""
+        slots = max(1, len(self.models))
+        return max(1, int(self._avg_duration * len(self._pending) / slots))
+
+    def status(self) -> Dict:
+        """Состояние слотов и очереди для мониторинга"""
+        with self._cond:
+            return {
+                "slots": [
+                    {"slot": slot, "job": {"id": job.id, "label": job.label} if job else None}
+                    for slot, job in ((s, self._running.get(s)) for s in range(len(self.models)))
+                ],
+                "pending": [
+                    {"id": job.id, "label": job.label, "position": i}
+                    for i, job in enumerate(self._pending, start=1)
+                ],
+                "max_queue": self.max_queue,
+                "avg_duration": round(self._avg_duration, 1)
+            }
+
+    def _worker(self, slot: int, model: Llama):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job = self._pending.popleft()
+                self._running[slot] = job
+
+            try:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+
+                logger.info(f"Слот {slot}: задача {job.id} запущена: {job.label}")
+                started = time.monotonic()
+                try:
+                    job.future.set_result(job.fn(*job.args, model=model, cancel=job.cancel_event, **job.kwargs))
+                except Exception as e:
+                    job.future.set_exception(e)
+
+                duration = time.monotonic() - started
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                logger.info(f"Слот {slot}: задача {job.id} завершена за {duration:.1f} сек")
+            finally:
+                with self._cond:
+                    self._running.pop(slot, None)
@@ -0,0 +1,95 @@
+import json
+from typing import Any, List, Tuple
+
+
+class JsonFieldParser:
+    """
+    Инкрементальный разбор JSON ответа {"<платформа>": {"<поле>": ...}} по мере генерации.
+    Сообщает о полях платформ, как только их значение закрыто: строка — по закрывающей
+    кавычке, список (теги) — по "]". Валидность всего документа не проверяется,
+    итоговый ответ все равно разбирается целиком.
+    """
+
+    def __init__(self):
+        # стек контейнеров: [тип ("{" или "["), текущий ключ, ожидается ли ключ, элементы списка]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._escape = False
+        self._raw: List[str] = []
+        self._scalar: List[str] = []
+
+    def feed(self, text: str) -> List[Tuple[str, str, Any]]:
+        """
+        Args:
+            text: очередной фрагмент ответа модели
+        Returns:
+            закрытые поля: [(платформа, поле, значение)]
+        """
+        completed = []
+        for ch in text:
+            if self._in_string:
+                self._raw.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    # strict=False: без грамматики модель пишет в строки реальные переносы строк
+                    try:
+                        self._on_value(json.loads("".join(self._raw), strict=False), completed, is_string=True)
+                    except json.JSONDecodeError:
+                        # некорректная строка: событие поля пропускается, ключ забывается
+                        if self._stack and self._stack[-1][0] == "{" and self._stack[-1][2]:
+                            self._stack[-1][1] = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._raw = [ch]
+            elif ch in "{[":
+                self._flush_scalar(completed)
+                self._stack.append([ch, None, ch == "{", []])
+            elif ch in "}]":
+                self._flush_scalar(completed)
+                if not self._stack:
+                    continue
+                kind, _, _, items = self._stack.pop()
+                if kind == "[":
+                    self._on_value(items, completed)
+            elif ch == ":":
+                if self._stack:
+                    self._stack[-1][2] = False
+            elif ch == ",":
+                self._flush_scalar(completed)
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][2] = True
+            elif not ch.isspace():
+                self._scalar.append(ch)
+        return completed
+
+    def _flush_scalar(self, completed: list):
+        """Число, true/false/null между разделителями"""
+        if not self._scalar:
+            return
+        raw = "".join(self._scalar)
+        self._scalar = []
+        try:
+            self._on_value(json.loads(raw), completed)
+        except json.JSONDecodeError:
+            pass
+
+    def _on_value(self, value: Any, completed: list, is_string: bool = False):
+        if not self._stack:
+            return
+        top = self._stack[-1]
+        if top[0] == "{" and top[2] and is_string:
+            top[1] = value
+            return
+        if top[0] == "[":
+            top[3].append(value)
+            return
+
+        # значение поля объекта: уровень 2 — поле платформы
+        if len(self._stack) == 2 and self._stack[0][1] is not None and top[1] is not None:
+            completed.append((self._stack[0][1], top[1], value))
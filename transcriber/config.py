@@ -1,2 +1,36 @@
+import os
+
+
 class Config:
-    MODEL_SIZE = "medium"
\ No newline at end of file
+    MODEL_SIZE = os.getenv("MODEL_SIZE", "medium")
+
+    # реестр моделей: какие размеры можно загрузить и какие грузить при старте
+    ALLOWED_MODEL_SIZES = os.getenv("ALLOWED_MODEL_SIZES", "tiny,base,small,medium,large").split(",")
+    PRELOAD_MODELS = [s for s in os.getenv("PRELOAD_MODELS", MODEL_SIZE).split(",") if s]
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+    # модель для коротких роликов (Shorts), пустое значение — всегда MODEL_SIZE
+    SHORT_MODEL_SIZE = os.getenv("SHORT_MODEL_SIZE", "") or None
+    SHORT_AUDIO_SECONDS = int(os.getenv("SHORT_AUDIO_SECONDS", "60"))
+
+    # параметры аудио, которые ожидает whisper
+    AUDIO_SAMPLE_RATE = 16000
+
+    # язык: пустое значение — автоопределение по первому окну
+    DEFAULT_LANGUAGE = os.getenv("DEFAULT_LANGUAGE", "") or None
+    FALLBACK_LANGUAGE = os.getenv("FALLBACK_LANGUAGE", "ru")
+    LANGUAGE_MIN_PROBABILITY = float(os.getenv("LANGUAGE_MIN_PROBABILITY", "0.5"))
+
+    # кэш извлеченного аудио на общем volume
+    AUDIO_CACHE_ENABLED = os.getenv("AUDIO_CACHE_ENABLED", "true").lower() == "true"
+    AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "/data/audio_cache")
+    AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", "2048"))
+
+    # кэш транскрипций по отпечатку аудио
+    TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+    TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", "/data/transcript_cache")
+    TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "500"))
+
+    # очередь инференса
+    INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "8"))
+    DISCONNECT_POLL_INTERVAL = 1.0  # сек
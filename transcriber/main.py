@@ -1,6 +1,10 @@
 import logging
+import threading
 from fastapi import FastAPI
-from routes import transcribe_router
+from fastapi.responses import JSONResponse
+from routes import transcribe_router, admin_router
+from services.model_registry import registry
+from config import Config
 import uvicorn
 
 logging.basicConfig(
@@ -18,14 +22,36 @@ app = FastAPI(
 )
 
 app.include_router(transcribe_router, tags=["transcribe"])
+app.include_router(admin_router, tags=["admin"])
 
 logger.info("Transcriber запущен")
 
 
+def preload_models():
+    """Фоновая загрузка и прогрев моделей из PRELOAD_MODELS"""
+    for model_size in Config.PRELOAD_MODELS:
+        try:
+            registry.load(model_size)
+        except Exception as e:
+            logger.error(f"Не удалось загрузить модель {model_size}: {e}", exc_info=True)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Модели грузятся в фоне: сервис сразу отвечает на /health, а /ready — после загрузки"""
+    threading.Thread(target=preload_models, name="model-preload", daemon=True).start()
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "transcriber"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    status = {"ready": registry.is_ready(), "service": "transcriber", **registry.status()}
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,3 +1,3 @@
-from .schemas import FileRequest, TranscribeResponse
+from .schemas import FileRequest, Segment, TranscribeResponse
 
-__all__ = ["FileRequest", "TranscribeResponse"]
+__all__ = ["FileRequest", "Segment", "TranscribeResponse"]
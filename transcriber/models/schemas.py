@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
 
 class FileRequest(BaseModel):
@@ -6,10 +7,27 @@ class FileRequest(BaseModel):
     Модель запроса с путем к локальному файлу
     """
     file_path: str
+    audio_path: Optional[str] = None  # готовый .wav (16 kHz, моно) от предыдущего шага
+    language: Optional[str] = None  # подсказка языка (ru, en, ...), иначе автоопределение
+    model_size: Optional[str] = None  # размер модели Whisper, иначе выбирается автоматически
+
+
+class Segment(BaseModel):
+    """
+    Фрагмент транскрипции с таймкодами в секундах
+    """
+    start: float
+    end: float
+    text: str
 
 
 class TranscribeResponse(BaseModel):
     """
     Модель ответа с результатом транскрибации
     """
-    text: str
\ No newline at end of file
+    text: str
+    segments: List[Segment] = []
+    language: Optional[str] = None
+    language_probability: Optional[float] = None
+    model_size: Optional[str] = None
+    cached: bool = False
\ No newline at end of file
@@ -1,3 +1,4 @@
 from .transcribe import router as transcribe_router
+from .admin import router as admin_router
 
-__all__ = ["transcribe_router"]
\ No newline at end of file
+__all__ = ["transcribe_router", "admin_router"]
\ No newline at end of file
@@ -0,0 +1,46 @@
+import logging
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from services.model_registry import registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/admin")
+
+
+@router.get("/models")
+async def list_models():
+    """Загруженные модели, модель по умолчанию и допустимые размеры"""
+    return registry.status()
+
+
+@router.post("/models/{model_size}/load")
+async def load_model(model_size: str, make_default: bool = False):
+    """
+    Загрузка и прогрев модели без перезапуска сервиса
+    Args:
+        model_size: Размер модели (tiny, base, small, medium, large)
+        make_default: Сделать модель моделью по умолчанию
+    """
+    logger.info(f"Запрос на загрузку модели {model_size}")
+    try:
+        registry.resolve(model_size)
+        await run_in_threadpool(registry.load, model_size)
+        if make_default:
+            registry.set_default(model_size)
+        return registry.status()
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Ошибка загрузки модели {model_size}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/models/{model_size}")
+async def unload_model(model_size: str):
+    """Выгрузка модели из памяти"""
+    logger.info(f"Запрос на выгрузку модели {model_size}")
+    if not await run_in_threadpool(registry.unload, model_size):
+        raise HTTPException(status_code=404, detail=f"Модель {model_size} не загружена")
+    return registry.status()
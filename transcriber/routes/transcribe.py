@@ -1,27 +1,160 @@
 import os
+import asyncio
 import logging
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from models import FileRequest, TranscribeResponse
-from services.audio_extractor import extract_audio
-from services.transcriber import WhisperTranscriber
+from services.audio_extractor import extract_audio, load_wav_pcm, pcm_to_float
+from services.audio_cache import AudioCache
+from services.transcript_cache import TranscriptCache, audio_fingerprint
+from services.inference_queue import InferenceQueue, QueueFullError
+from services.model_registry import registry
 from config import Config
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-transcriber = WhisperTranscriber(model_size=Config.MODEL_SIZE)
+audio_cache = AudioCache(Config.AUDIO_CACHE_DIR, Config.AUDIO_CACHE_MAX_MB) if Config.AUDIO_CACHE_ENABLED else None
+
+transcript_cache = TranscriptCache(Config.TRANSCRIPT_CACHE_DIR, Config.TRANSCRIPT_CACHE_SIZE) if Config.TRANSCRIPT_CACHE_ENABLED else None
+
+inference_queue = InferenceQueue(max_size=Config.INFERENCE_QUEUE_SIZE)
+
+# заголовок запроса с id задачи, выбранным клиентом
+JOB_ID_HEADER = "X-Request-Id"
+
+
+def prepare_audio(request: FileRequest):
+    """
+    Готовит аудио для whisper, по возможности без повторного декодирования видео
+    Порядок: готовый .wav от silence_cutter -> кэш по хэшу файла -> извлечение во временный файл
+    Returns:
+        Массив float32 (16 kHz, моно)
+    """
+    if request.audio_path and os.path.exists(request.audio_path):
+        try:
+            logger.info(f"Используется готовое аудио: {request.audio_path}")
+            return load_wav_pcm(request.audio_path)
+        except ValueError as e:
+            logger.warning(f"{e}, аудио будет извлечено из видео")
+
+    if audio_cache:
+        return load_wav_pcm(audio_cache.get_or_extract(request.file_path))
+
+    wav_path = extract_audio(request.file_path)
+    try:
+        return load_wav_pcm(wav_path)
+    finally:
+        if os.path.exists(wav_path):
+            os.remove(wav_path)
+
+
+async def run_in_worker(http_request: Request, fn, *args, label: str = "", response: Optional[Response] = None):
+    """
+    Выполняет блокирующую функцию в потоке инференса, не блокируя event loop.
+    Задача снимается с очереди, если клиент отключился до ее запуска.
+    Id задачи берется из заголовка X-Request-Id (по нему клиент может запрашивать
+    GET /queue/{id}, пока ждет ответа); id и позиция при постановке возвращаются
+    в заголовках X-Job-Id и X-Queue-Position.
+    Raises:
+        HTTPException: 503 с Retry-After, если очередь заполнена
+    """
+    request_id = (http_request.headers.get(JOB_ID_HEADER) or "")[:64] or None
+    try:
+        job = inference_queue.submit(fn, *args, label=label, job_id=request_id)
+    except QueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(inference_queue.retry_after())}
+        )
+
+    position = inference_queue.position(job)
+    logger.info(f"Задача {job.id} в очереди, позиция: {position}")
+    if response is not None:
+        response.headers["X-Job-Id"] = job.id
+        if position is not None:
+            response.headers["X-Queue-Position"] = str(position)
+    future = asyncio.wrap_future(job.future)
+    watch_disconnect = True
+
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=Config.DISCONNECT_POLL_INTERVAL)
+        if done:
+            return future.result()
+
+        if watch_disconnect and await http_request.is_disconnected():
+            if inference_queue.cancel(job):
+                logger.info(f"Клиент отключился, задача {job.id} снята с очереди")
+                raise HTTPException(status_code=499, detail="Клиент отключился")
+            # задача уже выполняется: дожидаемся ее, чтобы результат попал в кэш
+            watch_disconnect = False
+
+
+def select_model_size(audio, model_size: str = None) -> str:
+    """
+    Выбирает размер модели: явный из запроса, облегченный для коротких роликов или по умолчанию
+    Raises:
+        ValueError: если размер не разрешен
+    """
+    if not model_size and Config.SHORT_MODEL_SIZE:
+        if len(audio) <= Config.SHORT_AUDIO_SECONDS * Config.AUDIO_SAMPLE_RATE:
+            model_size = Config.SHORT_MODEL_SIZE
+    return registry.resolve(model_size)
+
+
+def transcribe_with_model(model_size: str, audio, language: str = None) -> dict:
+    """Транскрибация выбранной моделью (выполняется в потоке инференса, загружает модель при необходимости)"""
+    result = registry.get(model_size).transcribe(audio, language)
+    result["model_size"] = model_size
+    return result
+
+
+async def run_transcription(http_request: Request, audio, language: str = None, model_size: str = None, label: str = "", response: Optional[Response] = None) -> TranscribeResponse:
+    """
+    Транскрибирует аудио, отдавая результат из кэша, если такой звук уже распознавался
+    Args:
+        http_request: Исходный HTTP запрос (для отслеживания отключения клиента)
+        audio: Массив float32 (16 kHz, моно)
+        language: Подсказка языка; None — автоопределение
+        model_size: Размер модели Whisper; None — выбор по длительности или по умолчанию
+        label: Подпись задачи в очереди
+        response: Ответ, в заголовки которого пишутся X-Job-Id и X-Queue-Position
+    """
+    language = language or Config.DEFAULT_LANGUAGE
+    try:
+        model_size = select_model_size(audio, model_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cache_key = None
+    if transcript_cache:
+        fingerprint = await run_in_threadpool(audio_fingerprint, audio)
+        cache_key = f"{fingerprint}_{model_size}_{language or 'auto'}"
+        cached = await run_in_threadpool(transcript_cache.get, cache_key)
+        if cached:
+            logger.info(f"Транскрипция найдена в кэше: {cache_key}")
+            return TranscribeResponse(**cached, cached=True)
+
+    result = await run_in_worker(http_request, transcribe_with_model, model_size, audio, language, label=label, response=response)
+
+    if cache_key:
+        await run_in_threadpool(transcript_cache.put, cache_key, result)
+    return TranscribeResponse(**result)
 
 
 @router.post("/transcribe", response_model=TranscribeResponse)
-async def transcribe_file(request: FileRequest):
+async def transcribe_file(request: FileRequest, http_request: Request, http_response: Response):
     """
     Транскрибация видеофайла по локальному пути
     Args:
-        request: Запрос с путем к файлу
+        request: Запрос с путем к файлу и, опционально, к готовому аудио
     Returns:
-        Текст транскрипции
+        Текст транскрипции с сегментами
     """
     logger.info(f"Получен запрос на транскрибацию файла {request.file_path}")
     input_path = Path(request.file_path)
@@ -31,20 +164,62 @@ async def transcribe_file(request: FileRequest):
             logger.error(f"Файл не найден: {input_path}")
             raise HTTPException(status_code=404, detail=f"Файл не найден: {input_path}")
 
-        logger.info(f"Извлечение аудио из {input_path}")
-        wav_path = extract_audio(str(input_path))
-        
-        logger.info(f"Транскрибация файла {wav_path}")
-        text = transcriber.transcribe(wav_path)
+        logger.info(f"Подготовка аудио для {input_path}")
+        audio = await run_in_threadpool(prepare_audio, request)
+
+        logger.info(f"Транскрибация файла {input_path}")
+        response = await run_transcription(
+            http_request, audio, request.language, request.model_size, label=str(input_path), response=http_response
+        )
         logger.info("Транскрибация завершена")
 
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
+        return response
 
-        return TranscribeResponse(text=text)
-        
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Ошибка транскрибации: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/transcribe_pcm", response_model=TranscribeResponse)
+async def transcribe_pcm(request: Request, http_response: Response, language: Optional[str] = None, model_size: Optional[str] = None):
+    """
+    Транскрибация сырого PCM потока (s16le, 16 kHz, моно) из тела запроса
+    Args:
+        language: Подсказка языка в query-параметре, иначе автоопределение
+        model_size: Размер модели Whisper в query-параметре
+    Returns:
+        Текст транскрипции с сегментами
+    """
+    data = await request.body()
+    logger.info(f"Получен PCM поток на транскрибацию: {len(data)} байт")
+
+    if not data or len(data) % 2:
+        raise HTTPException(status_code=400, detail="Ожидается непустой PCM s16le поток")
+
+    try:
+        response = await run_transcription(request, pcm_to_float(data), language, model_size, label="pcm", response=http_response)
+        logger.info("Транскрибация завершена")
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка транскрибации: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/queue")
+async def get_queue():
+    """Состояние очереди инференса: выполняемая задача и позиции ожидающих"""
+    return inference_queue.status()
+
+
+@router.get("/queue/{job_id}")
+async def get_job_position(job_id: str):
+    """Позиция задачи: 0 — выполняется, 1..N — в очереди"""
+    position = inference_queue.position_by_id(job_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Задача {job_id} не найдена или завершена")
+    return {"id": job_id, "position": position}
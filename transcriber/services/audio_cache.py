@@ -0,0 +1,82 @@
+import os
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from services.audio_extractor import extract_audio
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class AudioCache:
+    """
+    Кэш извлеченного аудио на общем volume.
+    Ключ — хэш содержимого исходного файла, поэтому одно и то же видео
+    декодируется в аудио один раз, даже если оно пришло по другому пути.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: int = 2048):
+        """
+        Args:
+            cache_dir: Директория кэша
+            max_size_mb: Максимальный суммарный размер кэша в МБ
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+    def get_or_extract(self, video_path: str) -> str:
+        """
+        Возвращает путь к .wav из кэша, при промахе извлекает аудио через ffmpeg
+        Args:
+            video_path: Путь к видео
+        Returns:
+            Путь к .wav (16 kHz, моно) в кэше
+        """
+        key = file_hash(video_path)
+        cached_path = self.cache_dir / f"{key}.wav"
+
+        if cached_path.exists():
+            logger.info(f"Аудио найдено в кэше: {cached_path}")
+            os.utime(cached_path)
+            return str(cached_path)
+
+        tmp_path = self.cache_dir / f"{key}.{threading.get_ident()}.tmp.wav"
+        try:
+            extract_audio(video_path, str(tmp_path))
+            os.replace(tmp_path, cached_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        self._evict()
+        return str(cached_path)
+
+    def _evict(self):
+        """Удаляет самые давно использованные файлы, пока кэш больше лимита"""
+        with self._lock:
+            files = sorted(
+                (p for p in self.cache_dir.glob("*.wav") if not p.name.endswith(".tmp.wav")),
+                key=lambda p: p.stat().st_mtime
+            )
+            total = sum(p.stat().st_size for p in files)
+
+            while files and total > self.max_size_bytes:
+                oldest = files.pop(0)
+                total -= oldest.stat().st_size
+                oldest.unlink(missing_ok=True)
+                logger.info(f"Аудио удалено из кэша: {oldest.name}")
+
+
+def file_hash(path: str) -> str:
+    """
+    Считает sha256 содержимого файла
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
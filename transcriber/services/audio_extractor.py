@@ -1,16 +1,19 @@
 import ffmpeg
 import os
 import uuid
+import wave
 import logging
+import numpy as np
+from config import Config
 
 logger = logging.getLogger(__name__)
 
 
-def extract_audio(video_path: str) -> str:
+def extract_audio(video_path: str, output_path: str = None) -> str:
     """
     Извлекает аудио из видео в .wav 16 kHz, сливая в моно
     """
-    output_path = create_temp_filename(".wav")
+    output_path = output_path or create_temp_filename(".wav")
 
     logger.info(f"Извлечение аудио из {video_path}")
 
@@ -18,7 +21,7 @@ def extract_audio(video_path: str) -> str:
         (
             ffmpeg
             .input(video_path)
-            .output(output_path, format="wav", acodec="pcm_s16le", ac=1, ar="16000")
+            .output(output_path, format="wav", acodec="pcm_s16le", ac=1, ar=str(Config.AUDIO_SAMPLE_RATE))
             .overwrite_output()
             .run(quiet=True)
         )
@@ -30,10 +33,41 @@ def extract_audio(video_path: str) -> str:
         raise
 
 
+def load_wav_pcm(audio_path: str) -> np.ndarray:
+    """
+    Читает готовый .wav (16 kHz, моно, pcm_s16le) без запуска ffmpeg
+    Raises:
+        ValueError: если формат файла не совпадает с ожидаемым whisper
+    """
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            if (
+                wav.getframerate() != Config.AUDIO_SAMPLE_RATE
+                or wav.getnchannels() != 1
+                or wav.getsampwidth() != 2
+            ):
+                raise ValueError(
+                    f"Неподходящий формат аудио {audio_path}: "
+                    f"{wav.getframerate()} Hz, {wav.getnchannels()} ch, {wav.getsampwidth() * 8} bit"
+                )
+            frames = wav.readframes(wav.getnframes())
+    except wave.Error as e:
+        raise ValueError(f"Не удалось прочитать wav {audio_path}: {e}")
+
+    return pcm_to_float(frames)
+
+
+def pcm_to_float(data: bytes) -> np.ndarray:
+    """
+    Преобразует сырой PCM s16le в массив float32 [-1, 1], который принимает whisper
+    """
+    return np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
 def create_temp_filename(extension=".wav", directory="temp"):
     """
     Создает уникальное имя файла во временной директории
     """
     os.makedirs(directory, exist_ok=True)
     unique_name = f"audio_{uuid.uuid4().hex}{extension}"
-    return os.path.join(directory, unique_name)
\ No newline at end of file
+    return os.path.join(directory, unique_name)
@@ -0,0 +1,147 @@
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Очередь инференса заполнена"""
+    pass
+
+
+class InferenceJob:
+    """
+    Задача на инференс: функция с аргументами и Future для результата
+    """
+
+    def __init__(self, fn: Callable, args: tuple, label: str = "", job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.fn = fn
+        self.args = args
+        self.label = label
+        self.future: Future = Future()
+
+
+class InferenceQueue:
+    """
+    Ограниченная очередь задач с выделенным потоком-исполнителем.
+    Блокирующий инференс выполняется вне event loop, поэтому /health отвечает
+    во время транскрибации, а лишние запросы отклоняются вместо накопления.
+    """
+
+    def __init__(self, max_size: int = 8):
+        """
+        Args:
+            max_size: Максимальное количество ожидающих задач
+        """
+        self.max_size = max_size
+        self._pending: "deque[InferenceJob]" = deque()
+        self._running: Optional[InferenceJob] = None
+        self._cond = threading.Condition()
+        self._avg_duration = 60.0  # сек, скользящее среднее длительности задачи
+
+        self._thread = threading.Thread(target=self._worker, name="inference-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, label: str = "", job_id: Optional[str] = None) -> InferenceJob:
+        """
+        Ставит задачу в очередь
+        Args:
+            job_id: id задачи от клиента (чтобы следить за позицией до ответа);
+                    если такой id уже в очереди, генерируется новый
+        Raises:
+            QueueFullError: если в очереди уже max_size задач
+        """
+        with self._cond:
+            if len(self._pending) >= self.max_size:
+                raise QueueFullError(f"Очередь заполнена ({self.max_size} задач)")
+            if job_id and self._find(job_id) is not None:
+                job_id = None
+            job = InferenceJob(fn, args, label, job_id)
+            self._pending.append(job)
+            self._cond.notify()
+        return job
+
+    def position(self, job: InferenceJob) -> Optional[int]:
+        """Позиция задачи: 0 — выполняется, 1..N — в очереди, None — завершена"""
+        with self._cond:
+            if job is self._running:
+                return 0
+            for i, pending in enumerate(self._pending, start=1):
+                if pending is job:
+                    return i
+        return None
+
+    def position_by_id(self, job_id: str) -> Optional[int]:
+        """Позиция задачи по id: 0 — выполняется, 1..N — в очереди, None — не найдена или завершена"""
+        with self._cond:
+            job = self._find(job_id)
+        return self.position(job) if job else None
+
+    def _find(self, job_id: str) -> Optional[InferenceJob]:
+        """Выполняемая или ожидающая задача по id (вызывать под self._cond)"""
+        if self._running is not None and self._running.id == job_id:
+            return self._running
+        return next((job for job in self._pending if job.id == job_id), None)
+
+    def cancel(self, job: InferenceJob) -> bool:
+        """
+        Отменяет задачу, если она еще не начала выполняться
+        Returns:
+            True, если задача снята с очереди
+        """
+        with self._cond:
+            try:
+                self._pending.remove(job)
+            except ValueError:
+                return False
+        job.future.cancel()
+        return True
+
+    def retry_after(self) -> int:
+        """Оценка в секундах, через сколько в очереди освободится место"""
+        return max(1, int(self._avg_duration))
+
+    def status(self) -> Dict:
+        """Состояние очереди для мониторинга"""
+        with self._cond:
+            return {
+                "running": {"id": self._running.id, "label": self._running.label} if self._running else None,
+                "pending": [
+                    {"id": job.id, "label": job.label, "position": i}
+                    for i, job in enumerate(self._pending, start=1)
+                ],
+                "max_size": self.max_size,
+                "avg_duration": round(self._avg_duration, 1)
+            }
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job = self._pending.popleft()
+                self._running = job
+
+            try:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+
+                logger.info(f"Задача {job.id} запущена: {job.label}")
+                started = time.monotonic()
+                try:
+                    job.future.set_result(job.fn(*job.args))
+                except Exception as e:
+                    job.future.set_exception(e)
+
+                duration = time.monotonic() - started
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+                logger.info(f"Задача {job.id} завершена за {duration:.1f} сек")
+            finally:
+                with self._cond:
+                    self._running = None
@@ -0,0 +1,100 @@
+import gc
+import logging
+import threading
+from typing import Dict, List, Optional
+import torch
+from services.transcriber import WhisperTranscriber
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Реестр загруженных моделей Whisper.
+    Модели загружаются лениво и прогреваются, размеры можно загружать
+    и выгружать во время работы без передеплоя контейнера.
+    """
+
+    def __init__(self, default_size: str, allowed_sizes: List[str]):
+        """
+        Args:
+            default_size: Размер модели по умолчанию
+            allowed_sizes: Допустимые размеры моделей
+        """
+        self.default_size = default_size
+        self.allowed_sizes = allowed_sizes
+        self._models: Dict[str, WhisperTranscriber] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, model_size: Optional[str] = None) -> str:
+        """
+        Возвращает размер модели для запроса
+        Raises:
+            ValueError: если размер не разрешен
+        """
+        size = model_size or self.default_size
+        if size not in self.allowed_sizes:
+            allowed = ", ".join(self.allowed_sizes)
+            raise ValueError(f"Размер модели '{size}' не поддерживается. Доступные: {allowed}")
+        return size
+
+    def get(self, model_size: Optional[str] = None) -> WhisperTranscriber:
+        """Возвращает модель, загружая ее при первом обращении"""
+        size = self.resolve(model_size)
+        transcriber = self._models.get(size)
+        if transcriber is None:
+            transcriber = self.load(size)
+        return transcriber
+
+    def load(self, model_size: str) -> WhisperTranscriber:
+        """Загружает и прогревает модель, если она еще не загружена"""
+        size = self.resolve(model_size)
+        with self._lock:
+            if size in self._models:
+                return self._models[size]
+
+            transcriber = WhisperTranscriber(model_size=size)
+            if Config.WARMUP_ENABLED:
+                transcriber.warmup()
+            self._models[size] = transcriber
+            logger.info(f"Модель {size} добавлена в реестр")
+            return transcriber
+
+    def unload(self, model_size: str) -> bool:
+        """
+        Выгружает модель. Уже выполняющаяся транскрибация держит свою ссылку
+        и завершится штатно.
+        Returns:
+            True, если модель была загружена
+        """
+        with self._lock:
+            transcriber = self._models.pop(model_size, None)
+        if transcriber is None:
+            return False
+
+        del transcriber
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info(f"Модель {model_size} выгружена")
+        return True
+
+    def set_default(self, model_size: str):
+        """Меняет размер модели по умолчанию"""
+        self.default_size = self.resolve(model_size)
+        logger.info(f"Модель по умолчанию: {self.default_size}")
+
+    def is_ready(self) -> bool:
+        """Готов ли сервис: загружена модель по умолчанию"""
+        return self.default_size in self._models
+
+    def status(self) -> Dict:
+        return {
+            "default": self.default_size,
+            "loaded": sorted(self._models.keys()),
+            "allowed": self.allowed_sizes
+        }
+
+
+registry = ModelRegistry(Config.MODEL_SIZE, Config.ALLOWED_MODEL_SIZES)
@@ -1,5 +1,8 @@
 import whisper
 import logging
+import numpy as np
+from typing import Dict, Optional, Tuple, Union
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -19,15 +22,58 @@ class WhisperTranscriber:
             logger.error(f"Ошибка загрузки модели: {e}")
             raise
 
-    def transcribe(self, audio_path: str) -> str:
+    def warmup(self):
+        """Прогревочный проход на секунде тишины, чтобы первый запрос не платил за инициализацию"""
+        logger.info(f"Прогрев модели Whisper: {self.model_size}")
+        silence = np.zeros(Config.AUDIO_SAMPLE_RATE, dtype=np.float32)
+        self.model.transcribe(silence, language=Config.FALLBACK_LANGUAGE)
+        logger.info("Прогрев завершен")
+
+    def detect_language(self, audio: np.ndarray) -> Tuple[str, float]:
+        """
+        Определяет язык по первому 30-секундному окну
+        Returns:
+            (код языка, вероятность)
+        """
+        window = whisper.pad_or_trim(audio)
+        mel = whisper.log_mel_spectrogram(window, n_mels=self.model.dims.n_mels).to(self.model.device)
+        _, probs = self.model.detect_language(mel)
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
+
+    def transcribe(self, audio: Union[str, np.ndarray], language: Optional[str] = None) -> Dict:
         """
         Транскрибирует аудио с помощью whisper
+        Args:
+            audio: Путь к аудио файлу или массив float32 (16 kHz, моно)
+            language: Код языка; если не задан, определяется автоматически
+        Returns:
+            dict: {"text": str, "segments": [{"start", "end", "text"}], "language": str, "language_probability": float}
         """
         try:
-            result = self.model.transcribe(audio_path, language="ru")
-            text = result["text"]
+            if isinstance(audio, str):
+                audio = whisper.load_audio(audio)
+
+            probability = None
+            if not language:
+                language, probability = self.detect_language(audio)
+                logger.info(f"Определен язык: {language} ({probability:.2f})")
+                if probability < Config.LANGUAGE_MIN_PROBABILITY:
+                    logger.info(f"Низкая уверенность определения языка, используется {Config.FALLBACK_LANGUAGE}")
+                    language = Config.FALLBACK_LANGUAGE
+
+            result = self.model.transcribe(audio, language=language)
+            segments = [
+                {"start": round(seg["start"], 2), "end": round(seg["end"], 2), "text": seg["text"]}
+                for seg in result.get("segments", [])
+            ]
             logger.info("Транскрибация завершена")
-            return text
+            return {
+                "text": result["text"],
+                "segments": segments,
+                "language": language,
+                "language_probability": round(probability, 4) if probability is not None else None
+            }
         except Exception as e:
             logger.error(f"Ошибка транскрибации: {e}")
             raise
\ No newline at end of file
@@ -0,0 +1,91 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# сколько сэмплов 16 kHz усредняется в одну точку отпечатка (~1 kHz)
+FINGERPRINT_BLOCK = 16
+
+
+def audio_fingerprint(audio: np.ndarray) -> str:
+    """
+    Быстрый отпечаток декодированного аудио: хэш прореженного и огрубленного PCM.
+    Не зависит от пути к файлу и контейнера, только от самого звука.
+    Args:
+        audio: Массив float32 (16 kHz, моно)
+    Returns:
+        Hex-строка отпечатка
+    """
+    n_blocks = len(audio) // FINGERPRINT_BLOCK
+    blocks = audio[:n_blocks * FINGERPRINT_BLOCK].reshape(n_blocks, FINGERPRINT_BLOCK).mean(axis=1)
+    quantized = np.clip(np.round(blocks * 127), -127, 127).astype(np.int8)
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(len(audio).to_bytes(8, "little"))
+    digest.update(quantized.tobytes())
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Локальный LRU-кэш транскрипций (текст + сегменты) на диске.
+    Порядок использования восстанавливается по mtime файлов при старте.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 500):
+        """
+        Args:
+            cache_dir: Директория кэша
+            max_entries: Максимальное количество транскрипций в кэше
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Path]" = OrderedDict(
+            (p.stem, p) for p in sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        )
+        logger.info(f"Кэш транскрипций: {len(self._entries)} записей в {self.cache_dir}")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Возвращает сохраненную транскрипцию или None"""
+        with self._lock:
+            path = self._entries.get(key)
+            if path is None:
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+            return result
+        except (OSError, ValueError) as e:
+            logger.warning(f"Поврежденная запись кэша {path.name}: {e}")
+            with self._lock:
+                self._entries.pop(key, None)
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, key: str, result: Dict):
+        """Сохраняет транскрипцию и вытесняет самые давно использованные записи"""
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._entries[key] = path
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                oldest.unlink(missing_ok=True)
+                logger.info(f"Транскрипция удалена из кэша: {oldest.name}")